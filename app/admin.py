@@ -0,0 +1,13 @@
+from django.contrib import admin
+from app.models import MailTemplate
+
+@admin.register(MailTemplate)
+class MailTemplateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'version', 'subject', 'created_at']
+    list_filter = ['name']
+    search_fields = ['name', 'subject']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return ['name', 'version', 'subject', 'body', 'html_body', 'created_at']
+        return ['created_at']
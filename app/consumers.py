@@ -0,0 +1,51 @@
+import re
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from app.events import job_group, campaign_group, watch_jobs
+from app.scheduling import get_redis_connection
+
+GROUP_SAFE = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+
+class DeliveryStatusConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        self.groups_joined = set()
+        await self.accept()
+
+    async def disconnect(self, code):
+        for group in self.groups_joined:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict) or content.get('action') != 'subscribe':
+            await self.send_json({'error': "Unknown action, expected 'subscribe'."})
+            return
+
+        job_ids = content.get('job_ids', [])
+        if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+            await self.send_json({'error': "'job_ids' must be a list of strings."})
+            return
+
+        job_ids = [job_id for job_id in job_ids if GROUP_SAFE.match(job_id)]
+        campaign = content.get('campaign')
+
+        groups = [job_group(job_id) for job_id in job_ids]
+        if campaign and GROUP_SAFE.match(str(campaign)):
+            groups.append(campaign_group(campaign))
+
+        if len(self.groups_joined) + len(groups) > settings.MAIL_EVENTS['MAX_SUBSCRIPTIONS']:
+            await self.send_json({'error': 'Too many subscriptions.'})
+            return
+
+        for group in groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+            self.groups_joined.add(group)
+
+        if job_ids:
+            await sync_to_async(watch_jobs)(get_redis_connection(), job_ids)
+
+        await self.send_json({'subscribed': sorted(self.groups_joined)})
+
+    async def mail_progress(self, event):
+        await self.send_json(event['frame'])
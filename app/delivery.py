@@ -0,0 +1,185 @@
+import random
+import smtplib
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from core.rollups import bucket_label
+from app.exceptions import MailDeliveryError, TransientMailError, PermanentMailError, CircuitOpenError
+
+
+def classify_error(error):
+    if isinstance(error, MailDeliveryError):
+        return error
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        if codes and all(400 <= code < 500 for code in codes):
+            return TransientMailError(f"Recipient temporarily refused: {error.recipients}")
+        return PermanentMailError(f"Recipient refused: {error.recipients}")
+
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return TransientMailError(f"SMTP connection failed: {error}")
+
+    if isinstance(error, smtplib.SMTPResponseException):
+        if 400 <= error.smtp_code < 500:
+            return TransientMailError(f"SMTP {error.smtp_code}: {error.smtp_error!r}")
+        return PermanentMailError(f"SMTP {error.smtp_code}: {error.smtp_error!r}")
+
+    if isinstance(error, FileNotFoundError):
+        return PermanentMailError(f"Mail asset missing: {error}")
+
+    if isinstance(error, (OSError, TimeoutError)):
+        return TransientMailError(f"{type(error).__name__}: {error}")
+
+    return PermanentMailError(f"{type(error).__name__}: {error}")
+
+
+def is_connection_failure(error):
+    if isinstance(error, (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def backoff_delay(attempt):
+    delivery = settings.MAIL_DELIVERY
+    ceiling = min(delivery['BACKOFF_CAP'], delivery['BACKOFF_BASE'] * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class CircuitBreaker:
+    def __init__(self, connection, name='smtp'):
+        delivery = settings.MAIL_DELIVERY
+        self.connection = connection
+        self.failure_threshold = delivery['CIRCUIT_FAILURE_THRESHOLD']
+        self.window = delivery['CIRCUIT_WINDOW']
+        self.cooldown = delivery['CIRCUIT_COOLDOWN']
+        self.probe_timeout = delivery['CIRCUIT_PROBE_TIMEOUT']
+        self.open_key = f'mail:circuit:{name}:open'
+        self.tripped_key = f'mail:circuit:{name}:tripped'
+        self.failures_key = f'mail:circuit:{name}:failures'
+        self.probe_key = f'mail:circuit:{name}:probe'
+
+    def before_send(self):
+        pipeline = self.connection.pipeline(transaction=False)
+        pipeline.pttl(self.open_key)
+        pipeline.exists(self.tripped_key)
+        open_ttl, tripped = pipeline.execute()
+
+        if open_ttl > 0:
+            raise CircuitOpenError("SMTP circuit is open", retry_after=open_ttl / 1000)
+
+        if not tripped:
+            return False
+
+        if not self.connection.set(self.probe_key, 1, nx=True, ex=self.probe_timeout):
+            raise CircuitOpenError("SMTP circuit is half-open, probe in progress", retry_after=self.probe_timeout)
+
+        return True
+
+    def record_success(self, probing):
+        if probing:
+            self.connection.delete(self.tripped_key, self.failures_key, self.probe_key)
+
+    def record_failure(self, probing):
+        now = time.time()
+        pipeline = self.connection.pipeline(transaction=True)
+        pipeline.zremrangebyscore(self.failures_key, 0, now - self.window)
+        pipeline.zadd(self.failures_key, {f'{now}:{uuid.uuid4().hex}': now})
+        pipeline.zcard(self.failures_key)
+        pipeline.expire(self.failures_key, self.window)
+        _, _, failures, _ = pipeline.execute()
+
+        if probing or failures >= self.failure_threshold:
+            pipeline = self.connection.pipeline(transaction=False)
+            pipeline.set(self.open_key, 1, ex=self.cooldown)
+            pipeline.set(self.tripped_key, 1)
+            pipeline.delete(self.failures_key, self.probe_key)
+            pipeline.execute()
+
+
+class DeliveryLedger:
+    def __init__(self, connection):
+        self.connection = connection
+        self.ttl = settings.MAIL_DELIVERY['LEDGER_TTL_DAYS'] * 86400
+
+    def _day_key(self, timestamp=None):
+        day = datetime.fromtimestamp(timestamp or time.time(), dt_timezone.utc).strftime('%Y%m%d')
+        return f'mail:ledger:{day}'
+
+    def record(self, delivery_id, status, attempt, error=None):
+        now = time.time()
+        key = self._day_key(now)
+        entry = f"{status}|{attempt}|{int(now)}|{type(error).__name__ if error else ''}"
+
+        pipeline = self.connection.pipeline(transaction=False)
+        pipeline.hset(key, delivery_id, entry)
+        pipeline.hincrby(f'{key}:counts', status, 1)
+        pipeline.expire(key, self.ttl)
+        pipeline.expire(f'{key}:counts', self.ttl)
+        pipeline.execute()
+
+    def get(self, delivery_id, day):
+        entry = self.connection.hget(f'mail:ledger:{day}', delivery_id)
+        if entry is None:
+            return None
+        status, attempt, timestamp, error = entry.decode('utf-8').split('|')
+        return {
+            'status': status,
+            'attempt': int(attempt),
+            'timestamp': int(timestamp),
+            'error': error or None,
+        }
+
+    def counts(self, day):
+        counts = self.connection.hgetall(f'mail:ledger:{day}:counts')
+        return {status.decode('utf-8'): int(count) for status, count in counts.items()}
+
+
+LANE_LATENCY_BUCKETS_MS = (
+    250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000, 900000, 3600000
+)
+
+
+def histogram_percentile(histogram, percentile):
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    threshold = total * percentile / 100
+    seen = 0
+    for bound in LANE_LATENCY_BUCKETS_MS:
+        seen += histogram.get(f'le_{bound}', 0)
+        if seen >= threshold:
+            return bound
+    return float('inf')
+
+
+class LaneLatencyRecorder:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _minute_key(self, lane, timestamp):
+        minute = datetime.fromtimestamp(timestamp, dt_timezone.utc).strftime('%Y%m%d%H%M')
+        return f'mail:latency:{lane}:{minute}'
+
+    def record(self, lane, latency_ms):
+        key = self._minute_key(lane, time.time())
+
+        pipeline = self.connection.pipeline(transaction=False)
+        pipeline.hincrby(key, bucket_label(latency_ms, LANE_LATENCY_BUCKETS_MS), 1)
+        pipeline.expire(key, 86400)
+        pipeline.execute()
+
+    def histogram(self, lane, minutes):
+        now = time.time()
+        pipeline = self.connection.pipeline(transaction=False)
+        for offset in range(minutes):
+            pipeline.hgetall(self._minute_key(lane, now - offset * 60))
+
+        histogram = {}
+        for buckets in pipeline.execute():
+            for label, count in buckets.items():
+                label = label.decode('utf-8')
+                histogram[label] = histogram.get(label, 0) + int(count)
+        return histogram
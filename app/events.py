@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+EVENTS_KEY = 'mail:events'
+WATCHED_KEY = 'mail:events:watched'
+MAX_FAILED_IDS_PER_FRAME = 100
+
+
+def job_group(job_id):
+    return f'mail.job.{job_id}'
+
+
+def campaign_group(campaign):
+    return f'mail.campaign.{campaign}'
+
+
+def publish_delivery_event(connection, job_id, status, campaign=None):
+    pipeline = connection.pipeline(transaction=False)
+    pipeline.rpush(EVENTS_KEY, f"{job_id}|{status}|{campaign or ''}|{int(time.time())}")
+    pipeline.ltrim(EVENTS_KEY, -settings.MAIL_EVENTS['MAX_PENDING'], -1)
+    pipeline.execute()
+
+
+def watch_jobs(connection, job_ids):
+    expires_at = time.time() + settings.MAIL_EVENTS['WATCH_TTL']
+    connection.zadd(WATCHED_KEY, {job_id: expires_at for job_id in job_ids})
+
+
+class EventRelay:
+    def __init__(self, connection, batch_size=5000):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.channel_layer = get_channel_layer()
+
+    def _pop_batch(self):
+        pipeline = self.connection.pipeline(transaction=True)
+        pipeline.lrange(EVENTS_KEY, 0, self.batch_size - 1)
+        pipeline.ltrim(EVENTS_KEY, self.batch_size, -1)
+        events, _ = pipeline.execute()
+        return [event.decode('utf-8').split('|') for event in events]
+
+    def _watched(self, job_ids):
+        if not job_ids:
+            return set()
+        now = time.time()
+        scores = self.connection.zmscore(WATCHED_KEY, job_ids)
+        return {job_id for job_id, score in zip(job_ids, scores) if score and score > now}
+
+    def relay_once(self):
+        events = self._pop_batch()
+        if not events:
+            return 0
+
+        campaigns = {}
+        jobs = {}
+        for job_id, status, campaign, timestamp in events:
+            if campaign:
+                progress = campaigns.setdefault(campaign, {'counts': Counter(), 'failed': []})
+                progress['counts'][status] += 1
+                if status == 'failed' and len(progress['failed']) < MAX_FAILED_IDS_PER_FRAME:
+                    progress['failed'].append(job_id)
+            jobs.setdefault(job_id, []).append({'status': status, 'timestamp': int(timestamp)})
+
+        group_send = async_to_sync(self.channel_layer.group_send)
+
+        for campaign, progress in campaigns.items():
+            group_send(campaign_group(campaign), {
+                'type': 'mail.progress',
+                'frame': {
+                    'campaign': campaign,
+                    'counts': dict(progress['counts']),
+                    'failed': progress['failed'],
+                },
+            })
+
+        for job_id in self._watched(list(jobs)):
+            group_send(job_group(job_id), {
+                'type': 'mail.progress',
+                'frame': {
+                    'job_id': job_id,
+                    'events': jobs[job_id],
+                },
+            })
+
+        self.connection.zremrangebyscore(WATCHED_KEY, 0, time.time())
+        return len(events)
@@ -0,0 +1,22 @@
+class MailDeliveryError(Exception):
+    retryable = False
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TransientMailError(MailDeliveryError):
+    retryable = True
+
+
+class PermanentMailError(MailDeliveryError):
+    retryable = False
+
+
+class CircuitOpenError(TransientMailError):
+    pass
+
+
+class MailAssetCacheError(TransientMailError):
+    pass
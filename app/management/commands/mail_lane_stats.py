@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from app.delivery import LaneLatencyRecorder, histogram_percentile
+from app.scheduling import get_queue, get_shard_connection
+
+class Command(BaseCommand):
+    help = "Show queue depth and due-to-sent latency percentiles for each mail lane, excluding retry backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=15, help="Latency window in minutes.")
+
+    def handle(self, *args, **options):
+        shards = range(len(settings.REDIS_SHARDS))
+        recorders = [LaneLatencyRecorder(get_shard_connection(index)) for index in shards]
+
+        for lane in settings.MAIL_LANES:
+            depth = sum(get_queue(index, lane).count for index in shards)
+
+            histogram = {}
+            for recorder in recorders:
+                for label, count in recorder.histogram(lane, options['minutes']).items():
+                    histogram[label] = histogram.get(label, 0) + count
+
+            percentiles = ', '.join(
+                f"p{percentile}<={self._format(histogram_percentile(histogram, percentile))}"
+                for percentile in (50, 95, 99)
+            )
+            self.stdout.write(
+                f"{lane}: queued {depth}, sent {sum(histogram.values())} in {options['minutes']}m, {percentiles}"
+            )
+
+    def _format(self, bound):
+        if bound is None:
+            return '-'
+        if bound == float('inf'):
+            return 'inf'
+        return f"{bound / 1000:g}s"
@@ -0,0 +1,44 @@
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from app.delivery import DeliveryLedger
+from app.scheduling import get_shard_connection
+
+class Command(BaseCommand):
+    help = "Show delivery outcome counts for a day, or the outcome of specific jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*')
+        parser.add_argument(
+            '--day',
+            default=datetime.now(dt_timezone.utc).strftime('%Y%m%d'),
+            help="UTC day in YYYYMMDD format (default: today)."
+        )
+
+    def handle(self, *args, **options):
+        ledgers = [
+            DeliveryLedger(get_shard_connection(index))
+            for index in range(len(settings.REDIS_SHARDS))
+        ]
+        day = options['day']
+
+        if not options['job_ids']:
+            counts = Counter()
+            for ledger in ledgers:
+                counts.update(ledger.counts(day))
+            for status, count in sorted(counts.items()):
+                self.stdout.write(f"{status}: {count}")
+            return
+
+        for job_id in options['job_ids']:
+            entry = next(
+                (entry for entry in (ledger.get(job_id, day) for ledger in ledgers) if entry),
+                None
+            )
+            if entry is None:
+                self.stdout.write(f"{job_id}: not found")
+            else:
+                self.stdout.write(
+                    f"{job_id}: {entry['status']} (attempt {entry['attempt']}, error {entry['error'] or '-'})"
+                )
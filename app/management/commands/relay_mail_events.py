@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from app.events import EventRelay
+from app.scheduling import get_redis_connection
+
+class Command(BaseCommand):
+    help = "Coalesce delivery events from the workers and push them to WebSocket subscribers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0.5, help="Seconds between relay ticks.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Maximum events coalesced per tick.")
+
+    def handle(self, *args, **options):
+        relay = EventRelay(get_redis_connection(), batch_size=options['batch_size'])
+
+        while True:
+            relayed = relay.relay_once()
+            if relayed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from redis import Redis
+from rq import Queue
+from rq_scheduler import Scheduler
+from app.scheduling import get_ring, get_queue, get_scheduler, get_shard_connection, lane_for_queue, shard_for, shard_queue_name
+
+class Command(BaseCommand):
+    help = (
+        "Move scheduled and queued mail jobs to the shard and queue that own them under the current "
+        "REDIS_SHARDS ring. Every queue on every shard is scanned, so jobs left in queues named after "
+        "an old shard position are re-homed too. Jobs are copied to their new shard before being "
+        "removed from the old one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--drain',
+            nargs='*',
+            default=[],
+            help="Redis URLs of shards that were removed from REDIS_SHARDS and must be emptied."
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        sources = [(index, get_shard_connection(index)) for index in range(len(settings.REDIS_SHARDS))]
+        sources.extend((None, Redis.from_url(url, socket_timeout=5)) for url in options['drain'])
+
+        ring = get_ring()
+        moved = 0
+
+        for index, connection in sources:
+            scheduler = Scheduler(connection=connection)
+            for job, scheduled_time in scheduler.get_jobs(with_times=True):
+                target, queue_name = self._home(job, job.origin, ring)
+                if target == index and job.origin == queue_name:
+                    continue
+                moved += 1
+                if options['dry_run']:
+                    continue
+                if target == index:
+                    job.origin = queue_name
+                    job.save()
+                    continue
+                get_scheduler(target).enqueue_at(
+                    scheduled_time,
+                    job.func_name,
+                    *job.args,
+                    job_id=job.id,
+                    queue_name=queue_name,
+                    timeout=job.timeout,
+                    job_result_ttl=job.result_ttl,
+                    meta=job.meta,
+                    **job.kwargs
+                )
+                scheduler.cancel(job)
+                job.delete()
+
+            for queue in Queue.all(connection=connection):
+                for job in queue.jobs:
+                    target, queue_name = self._home(job, queue.name, ring)
+                    if target == index and queue.name == queue_name:
+                        continue
+                    moved += 1
+                    if options['dry_run']:
+                        continue
+                    if target == index:
+                        Queue(queue_name, connection=connection).enqueue_job(job)
+                        queue.remove(job)
+                        continue
+                    get_queue(target, lane_for_queue(queue.name)).enqueue(
+                        job.func_name,
+                        args=job.args,
+                        kwargs=job.kwargs,
+                        job_id=job.id,
+                        job_timeout=job.timeout,
+                        result_ttl=job.result_ttl,
+                        meta=job.meta
+                    )
+                    queue.remove(job)
+                    job.delete()
+
+        action = "would move" if options['dry_run'] else "moved"
+        self.stdout.write(f"{action} {moved} jobs across {len(settings.REDIS_SHARDS)} shards")
+
+    def _home(self, job, queue_name, ring):
+        target = shard_for(job.kwargs.get('delivery_id') or job.id, job.args[0], ring)
+        return target, shard_queue_name(target, lane_for_queue(queue_name))
@@ -0,0 +1,60 @@
+import signal
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from app.scheduling import shard_queue_name
+
+class Command(BaseCommand):
+    help = "Run rq workers, and optionally an rq scheduler, for each shard in the given shard set."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shards',
+            default=None,
+            help="Comma separated shard indexes owned by this host (default: all shards)."
+        )
+        parser.add_argument('--workers', type=int, default=1, help="Workers per shard.")
+        parser.add_argument('--no-scheduler', action='store_true', help="Do not run rqscheduler for the shards.")
+        parser.add_argument(
+            '--scheduler-interval',
+            type=int,
+            default=1,
+            help="Seconds between rqscheduler polls for due jobs."
+        )
+
+    def handle(self, *args, **options):
+        shard_count = len(settings.REDIS_SHARDS)
+        if options['shards']:
+            shards = [int(index) for index in options['shards'].split(',')]
+        else:
+            shards = list(range(shard_count))
+
+        invalid = [index for index in shards if not 0 <= index < shard_count]
+        if invalid:
+            raise CommandError(f"Unknown shard indexes {invalid}, REDIS_SHARDS has {shard_count} entries.")
+
+        manage = [sys.executable, sys.argv[0]]
+        processes = []
+        for index in shards:
+            queue_names = [shard_queue_name(index, lane) for lane in settings.MAIL_LANES]
+            for _ in range(options['workers']):
+                processes.append(subprocess.Popen(
+                    manage + ['rqworker', *queue_names, '--worker-class', 'app.workers.WeightedLaneWorker']
+                ))
+            if not options['no_scheduler']:
+                processes.append(subprocess.Popen(
+                    manage + ['rqscheduler', '--queue', shard_queue_name(index),
+                              '--interval', str(options['scheduler_interval'])]
+                ))
+
+        def terminate(signum, frame):
+            for process in processes:
+                process.send_signal(signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, terminate)
+        signal.signal(signal.SIGINT, terminate)
+
+        exit_codes = [process.wait() for process in processes]
+        if any(exit_codes):
+            raise CommandError(f"Shard processes exited with {exit_codes}")
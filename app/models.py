@@ -1 +1,18 @@
 from django.db import models
+
+class MailTemplate(models.Model):
+    name = models.SlugField(max_length=100)
+    version = models.PositiveIntegerField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name', '-version']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'version'], name='unique_mail_template_version'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} v{self.version}'
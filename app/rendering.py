@@ -0,0 +1,31 @@
+from functools import lru_cache
+from django.conf import settings
+from django.db import close_old_connections
+from django.template import Context, Engine
+from app.models import MailTemplate
+
+text_engine = Engine(autoescape=False)
+html_engine = Engine()
+
+
+@lru_cache(maxsize=settings.MAIL_TEMPLATE_CACHE_SIZE)
+def get_compiled_template(template_id, template_version):
+    close_old_connections()
+    template = MailTemplate.objects.get(pk=template_id, version=template_version)
+
+    return (
+        text_engine.from_string(template.subject),
+        text_engine.from_string(template.body),
+        html_engine.from_string(template.html_body) if template.html_body else None,
+    )
+
+
+def render_mail(template_id, template_version, context):
+    subject, body, html_body = get_compiled_template(template_id, template_version)
+    text_context = Context(context or {}, autoescape=False)
+
+    return (
+        ' '.join(subject.render(text_context).split()),
+        body.render(text_context),
+        html_body.render(Context(context or {})) if html_body else None,
+    )
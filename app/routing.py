@@ -0,0 +1,6 @@
+from django.urls import path
+from app.consumers import DeliveryStatusConsumer
+
+websocket_urlpatterns = [
+    path('ws/mail-status/', DeliveryStatusConsumer.as_asgi()),
+]
@@ -0,0 +1,69 @@
+import uuid
+from django.conf import settings
+from rq import Queue
+from rq_scheduler import Scheduler
+from redis import Redis
+from app.sharding import HashRing, routing_key
+
+_connections = {}
+_ring = None
+
+SHARD_SUFFIX = '-shard'
+
+
+def shard_queue_name(index, lane='default'):
+    return lane if index == 0 else f'{lane}{SHARD_SUFFIX}{index}'
+
+
+def lane_for_queue(queue_name):
+    return queue_name.split(SHARD_SUFFIX, 1)[0]
+
+
+def get_shard_connection(index):
+    if index not in _connections:
+        _connections[index] = Redis.from_url(settings.REDIS_SHARDS[index], socket_timeout=5)
+    return _connections[index]
+
+
+def get_redis_connection():
+    return get_shard_connection(0)
+
+
+def get_ring():
+    global _ring
+    if _ring is None:
+        _ring = HashRing(settings.REDIS_SHARDS)
+    return _ring
+
+
+def shard_for(job_id, recipient_email, ring=None):
+    key = routing_key(settings.MAIL_SHARD_KEY, job_id, recipient_email)
+    return (ring or get_ring()).get(key)
+
+
+def get_scheduler(index=0):
+    return Scheduler(queue_name=shard_queue_name(index), connection=get_shard_connection(index))
+
+
+def get_job_scheduler(job):
+    return Scheduler(queue_name=job.origin, connection=job.connection)
+
+
+def get_queue(index=0, lane='default'):
+    return Queue(shard_queue_name(index, lane), connection=get_shard_connection(index))
+
+
+def schedule_mail(scheduled_time, func, recipient_email, *args, priority='default', **kwargs):
+    job_id = str(uuid.uuid4())
+    index = shard_for(job_id, recipient_email)
+    return get_scheduler(index).enqueue_at(
+        scheduled_time,
+        func,
+        recipient_email,
+        *args,
+        job_id=job_id,
+        queue_name=shard_queue_name(index, priority),
+        timeout=settings.MAIL_LANES[priority]['TIMEOUT'],
+        meta={'scheduled_for': scheduled_time.timestamp()},
+        **kwargs
+    )
@@ -1,13 +1,95 @@
+import json
 from rest_framework import serializers
+from django.conf import settings
+from django.db.models import Max
+from django.template import TemplateSyntaxError
 from django.utils import timezone
+from app.models import MailTemplate
+from app.rendering import text_engine, html_engine
 
 class ScheduleMailSerializer(serializers.Serializer):
     recipient_email = serializers.EmailField()
-    subject = serializers.CharField(max_length=200)
-    message = serializers.CharField()
+    subject = serializers.CharField(max_length=200, required=False)
+    message = serializers.CharField(required=False)
+    template = serializers.SlugField(required=False)
+    template_version = serializers.IntegerField(required=False, min_value=1)
+    context = serializers.DictField(required=False)
+    html_message = serializers.CharField(required=False)
+    attachments = serializers.ListField(
+        child=serializers.FileField(),
+        required=False,
+        max_length=10
+    )
     scheduled_time = serializers.DateTimeField()
+    campaign = serializers.RegexField(r'^[A-Za-z0-9_.-]{1,64}$', required=False)
+    priority = serializers.ChoiceField(choices=list(settings.MAIL_LANES), default='default')
     
     def validate_scheduled_time(self, value):
         if value <= timezone.now():
             raise serializers.ValidationError("The submission time must be in the future.")
-        return value
\ No newline at end of file
+        return value
+
+    def validate_context(self, value):
+        if len(json.dumps(value, default=str)) > settings.MAIL_TEMPLATE_CONTEXT_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Context exceeds {settings.MAIL_TEMPLATE_CONTEXT_MAX_BYTES} bytes."
+            )
+        return value
+
+    def validate_attachments(self, value):
+        for attachment in value:
+            if attachment.size > settings.MAIL_ATTACHMENT_MAX_BYTES:
+                raise serializers.ValidationError(
+                    f"'{attachment.name}' exceeds the {settings.MAIL_ATTACHMENT_MAX_BYTES} byte attachment limit."
+                )
+        return value
+
+    def validate(self, attrs):
+        name = attrs.get('template')
+
+        if not name:
+            if not attrs.get('subject') or not attrs.get('message'):
+                raise serializers.ValidationError(
+                    "Either 'template' or both 'subject' and 'message' are required."
+                )
+            return attrs
+
+        templates = MailTemplate.objects.filter(name=name)
+        if attrs.get('template_version'):
+            templates = templates.filter(version=attrs['template_version'])
+
+        template = templates.order_by('-version').only('id', 'version').first()
+        if template is None:
+            raise serializers.ValidationError({'template': f"Template '{name}' does not exist."})
+
+        attrs['template_id'] = template.id
+        attrs['template_version'] = template.version
+        return attrs
+
+
+class MailTemplateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MailTemplate
+        fields = ['id', 'name', 'version', 'subject', 'body', 'html_body', 'created_at']
+        read_only_fields = ['id', 'version', 'created_at']
+
+    def validate_subject(self, value):
+        return self._compile(text_engine, value)
+
+    def validate_body(self, value):
+        return self._compile(text_engine, value)
+
+    def validate_html_body(self, value):
+        return self._compile(html_engine, value)
+
+    def _compile(self, engine, value):
+        try:
+            engine.from_string(value)
+        except TemplateSyntaxError as e:
+            raise serializers.ValidationError(f"Template syntax error: {e}")
+        return value
+
+    def create(self, validated_data):
+        latest = MailTemplate.objects.filter(name=validated_data['name']).aggregate(Max('version'))
+        validated_data['version'] = (latest['version__max'] or 0) + 1
+        return super().create(validated_data)
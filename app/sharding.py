@@ -0,0 +1,33 @@
+import bisect
+import hashlib
+from urllib.parse import urlparse
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+def shard_node_name(url):
+    parsed = urlparse(url)
+    return f'{parsed.hostname}:{parsed.port or 6379}{parsed.path or "/0"}'
+
+
+class HashRing:
+    def __init__(self, urls, replicas=160):
+        self.ring = []
+        for index, url in enumerate(urls):
+            node = shard_node_name(url)
+            for replica in range(replicas):
+                self.ring.append((_hash(f'{node}#{replica}'), index))
+        self.ring.sort()
+        self.points = [point for point, _ in self.ring]
+
+    def get(self, key):
+        position = bisect.bisect(self.points, _hash(key)) % len(self.ring)
+        return self.ring[position][1]
+
+
+def routing_key(shard_key, job_id, recipient_email):
+    if shard_key == 'domain':
+        return recipient_email.rsplit('@', 1)[-1].lower()
+    return job_id
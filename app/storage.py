@@ -0,0 +1,132 @@
+import hashlib
+import os
+import tempfile
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from app.exceptions import MailAssetCacheError
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _content_key(file_obj):
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    file_obj.seek(0)
+    return f'{settings.MAIL_ASSET_PREFIX}/{digest.hexdigest()}'
+
+
+def store_mail_asset(file_obj):
+    key = _content_key(file_obj)
+    if not default_storage.exists(key):
+        key = default_storage.save(key, file_obj)
+    return key
+
+
+def store_html_body(html_message):
+    return store_mail_asset(ContentFile(html_message.encode('utf-8')))
+
+
+def store_attachment(uploaded_file):
+    return {
+        'key': store_mail_asset(uploaded_file),
+        'name': os.path.basename(uploaded_file.name),
+        'content_type': uploaded_file.content_type or 'application/octet-stream',
+    }
+
+
+class MailAssetCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _local_path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def open(self, key):
+        path = self._local_path(key)
+
+        try:
+            local_file = open(path, 'rb')
+        except FileNotFoundError:
+            return self._fetch(key, path)
+        except OSError as e:
+            raise MailAssetCacheError(f"Mail asset cache unavailable: {e}") from e
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return local_file
+
+    def _fetch(self, key, path):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        except OSError as e:
+            raise MailAssetCacheError(f"Mail asset cache unavailable: {e}") from e
+
+        try:
+            with os.fdopen(fd, 'wb') as local_file, default_storage.open(key, 'rb') as remote_file:
+                for chunk in remote_file.chunks(CHUNK_SIZE):
+                    local_file.write(chunk)
+            cached_file = open(tmp_path, 'rb')
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+
+        self._evict(keep=path)
+        return cached_file
+
+    def read_bytes(self, key):
+        with self.open(key) as local_file:
+            return local_file.read()
+
+    def read_text(self, key):
+        return self.read_bytes(key).decode('utf-8')
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep=None):
+        try:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.part') or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                total += stat.st_size
+                if entry.path != keep:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+        except OSError:
+            pass
+
+
+_cache = None
+
+
+def get_mail_asset_cache():
+    global _cache
+    if _cache is None:
+        _cache = MailAssetCache(settings.MAIL_ASSET_CACHE_DIR, settings.MAIL_ASSET_CACHE_MAX_BYTES)
+    return _cache
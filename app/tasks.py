@@ -1,16 +1,123 @@
-from django.core.mail import send_mail
+import time
+from datetime import timedelta
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
+from rq import get_current_job
+from app.delivery import CircuitBreaker, DeliveryLedger, LaneLatencyRecorder, backoff_delay, classify_error, is_connection_failure
+from app.events import publish_delivery_event
+from app.exceptions import TransientMailError, CircuitOpenError
+from app.scheduling import get_redis_connection, get_job_scheduler, get_scheduler, lane_for_queue
+from app.rendering import render_mail
+from app.storage import get_mail_asset_cache
 
-def send_scheduled_email(recipient_email, subject, message):
+def build_email(recipient_email, subject, message, html_key=None, attachments=None,
+                template_id=None, template_version=None, context=None):
+    html_message = None
+    if template_id:
+        subject, message, html_message = render_mail(template_id, template_version, context)
+    
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient_email],
+    )
+    
+    cache = get_mail_asset_cache()
+    
+    if html_message:
+        email.attach_alternative(html_message, 'text/html')
+    elif html_key:
+        email.attach_alternative(cache.read_text(html_key), 'text/html')
+    
+    for attachment in attachments or []:
+        email.attach(attachment['name'], cache.read_bytes(attachment['key']), attachment['content_type'])
+    
+    return email
+
+
+def send_scheduled_email(recipient_email, subject, message, html_key=None, attachments=None,
+                         template_id=None, template_version=None, context=None,
+                         campaign=None, attempt=1, delivery_id=None):
+    job = get_current_job()
+    connection = job.connection if job else get_redis_connection()
+    delivery_id = delivery_id or (job.id if job else recipient_email)
+    
+    control_connection = get_redis_connection()
+    
+    breaker = CircuitBreaker(control_connection)
+    ledger = DeliveryLedger(connection)
+    probing = False
+    
+    def record_outcome(status, error=None):
+        ledger.record(delivery_id, status, attempt, error)
+        publish_delivery_event(control_connection, delivery_id, status, campaign)
+    
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            fail_silently=False,
-        )
-        return f"Email sent to {recipient_email}"
+        try:
+            email = build_email(
+                recipient_email, subject, message, html_key, attachments,
+                template_id, template_version, context
+            )
+        except Exception as e:
+            raise classify_error(e) from e
+        
+        probing = breaker.before_send()
+        
+        try:
+            email.send(fail_silently=False)
+        except Exception as e:
+            if is_connection_failure(e):
+                breaker.record_failure(probing)
+            else:
+                breaker.record_success(probing)
+            raise classify_error(e) from e
+    
+    except TransientMailError as e:
+        next_attempt = attempt if isinstance(e, CircuitOpenError) else attempt + 1
+        
+        if next_attempt <= settings.MAIL_DELIVERY['MAX_ATTEMPTS']:
+            delay = backoff_delay(attempt) + (e.retry_after or 0)
+            meta = {**job.meta, 'scheduled_for': time.time() + delay} if job else None
+            
+            scheduler = get_job_scheduler(job) if job else get_scheduler()
+            scheduler.enqueue_in(
+                timedelta(seconds=delay),
+                send_scheduled_email,
+                recipient_email,
+                subject,
+                message,
+                html_key=html_key,
+                attachments=attachments,
+                template_id=template_id,
+                template_version=template_version,
+                context=context,
+                campaign=campaign,
+                attempt=next_attempt,
+                delivery_id=delivery_id,
+                timeout=job.timeout if job else None,
+                meta=meta,
+                job_result_ttl=0
+            )
+            record_outcome('retrying', e)
+            
+            if isinstance(e, CircuitOpenError):
+                return
+            
+            if job:
+                job.failure_ttl = settings.MAIL_DELIVERY['RETRIED_FAILURE_TTL']
+        else:
+            record_outcome('failed', e)
+        raise
     
     except Exception as e:
-        return f"Error sending email: {str(e)}"
\ No newline at end of file
+        record_outcome('failed', e)
+        raise
+    
+    breaker.record_success(probing)
+    record_outcome('sent')
+    
+    scheduled_for = job.meta.get('scheduled_for') if job else None
+    if scheduled_for:
+        latency_ms = max(0, (time.time() - scheduled_for) * 1000)
+        LaneLatencyRecorder(connection).record(lane_for_queue(job.origin), latency_ms)
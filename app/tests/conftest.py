@@ -0,0 +1,12 @@
+import fakeredis
+import pytest
+from app import scheduling
+
+
+@pytest.fixture
+def redis_connection():
+    connection = fakeredis.FakeRedis()
+    scheduling._connections.clear()
+    scheduling._connections[0] = connection
+    yield connection
+    scheduling._connections.clear()
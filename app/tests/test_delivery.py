@@ -0,0 +1,231 @@
+import smtplib
+import socket
+from unittest import mock
+import pytest
+from django.core import mail
+from django.test import override_settings
+from rq_scheduler import Scheduler
+from app import delivery
+from app.delivery import CircuitBreaker, DeliveryLedger, backoff_delay, classify_error, is_connection_failure
+from app.events import EVENTS_KEY
+from app.exceptions import CircuitOpenError, PermanentMailError, TransientMailError
+from app.tasks import send_scheduled_email
+
+MAIL_DELIVERY = {
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE': 30,
+    'BACKOFF_CAP': 3600,
+    'RETRIED_FAILURE_TTL': 86400,
+    'CIRCUIT_FAILURE_THRESHOLD': 3,
+    'CIRCUIT_WINDOW': 60,
+    'CIRCUIT_COOLDOWN': 60,
+    'CIRCUIT_PROBE_TIMEOUT': 30,
+    'LEDGER_TTL_DAYS': 7,
+}
+
+GREYLISTED = smtplib.SMTPRecipientsRefused({'user@example.com': (450, b'Greylisted')})
+
+
+@pytest.fixture(autouse=True)
+def delivery_settings():
+    with override_settings(
+        MAIL_DELIVERY=MAIL_DELIVERY,
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+    ):
+        yield
+
+
+@pytest.mark.parametrize('error, expected', [
+    (GREYLISTED, TransientMailError),
+    (smtplib.SMTPRecipientsRefused({'user@example.com': (550, b'No such user')}), PermanentMailError),
+    (smtplib.SMTPServerDisconnected('Connection unexpectedly closed'), TransientMailError),
+    (smtplib.SMTPConnectError(421, 'Too busy'), TransientMailError),
+    (smtplib.SMTPDataError(452, 'Mailbox full'), TransientMailError),
+    (smtplib.SMTPDataError(554, 'Rejected'), PermanentMailError),
+    (ConnectionRefusedError(), TransientMailError),
+    (socket.timeout(), TransientMailError),
+    (FileNotFoundError('mail-assets/missing'), PermanentMailError),
+    (ValueError('bad header'), PermanentMailError),
+])
+def test_classify_error(error, expected):
+    assert type(classify_error(error)) is expected
+
+
+@pytest.mark.parametrize('error, expected', [
+    (smtplib.SMTPConnectError(421, 'Too busy'), True),
+    (smtplib.SMTPServerDisconnected(), True),
+    (ConnectionRefusedError(), True),
+    (socket.timeout(), True),
+    (GREYLISTED, False),
+    (smtplib.SMTPDataError(452, 'Mailbox full'), False),
+    (smtplib.SMTPSenderRefused(451, 'Try later', 'noreply@app.com'), False),
+])
+def test_is_connection_failure(error, expected):
+    assert is_connection_failure(error) is expected
+
+
+def test_backoff_delay_grows_with_jitter_up_to_the_cap():
+    for attempt, ceiling in [(1, 30), (2, 60), (3, 120), (10, 3600), (50, 3600)]:
+        delays = [backoff_delay(attempt) for _ in range(200)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_failures(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+
+        for _ in range(2):
+            breaker.record_failure(False)
+        assert breaker.before_send() is False
+
+        breaker.record_failure(False)
+        with pytest.raises(CircuitOpenError) as excinfo:
+            breaker.before_send()
+        assert 0 < excinfo.value.retry_after <= 60
+
+    def test_failures_outside_the_window_do_not_count(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+
+        with mock.patch.object(delivery.time, 'time', return_value=1000.0):
+            breaker.record_failure(False)
+            breaker.record_failure(False)
+        with mock.patch.object(delivery.time, 'time', return_value=1061.0):
+            breaker.record_failure(False)
+            breaker.record_failure(False)
+
+        assert breaker.before_send() is False
+
+    def test_later_failures_do_not_extend_earlier_ones(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+
+        for now in (1000.0, 1040.0, 1080.0):
+            with mock.patch.object(delivery.time, 'time', return_value=now):
+                breaker.record_failure(False)
+
+        assert breaker.before_send() is False
+
+    def test_half_open_allows_a_single_probe(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+        for _ in range(3):
+            breaker.record_failure(False)
+        redis_connection.delete(breaker.open_key)
+
+        assert breaker.before_send() is True
+        with pytest.raises(CircuitOpenError):
+            breaker.before_send()
+
+    def test_successful_probe_closes_the_circuit(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+        for _ in range(3):
+            breaker.record_failure(False)
+        redis_connection.delete(breaker.open_key)
+
+        breaker.record_success(breaker.before_send())
+
+        assert breaker.before_send() is False
+        assert not redis_connection.exists(breaker.failures_key)
+
+    def test_failed_probe_reopens_the_circuit(self, redis_connection):
+        breaker = CircuitBreaker(redis_connection)
+        for _ in range(3):
+            breaker.record_failure(False)
+        redis_connection.delete(breaker.open_key)
+
+        breaker.record_failure(breaker.before_send())
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_send()
+
+
+def test_ledger_keeps_the_latest_outcome_and_counts(redis_connection):
+    ledger = DeliveryLedger(redis_connection)
+    day = ledger._day_key().rsplit(':', 1)[-1]
+
+    ledger.record('job-1', 'retrying', 1, TransientMailError('busy'))
+    ledger.record('job-1', 'sent', 2)
+    ledger.record('job-2', 'failed', 1, PermanentMailError('rejected'))
+
+    assert ledger.get('job-1', day) == {
+        'status': 'sent', 'attempt': 2, 'timestamp': mock.ANY, 'error': None
+    }
+    assert ledger.get('job-2', day)['error'] == 'PermanentMailError'
+    assert ledger.counts(day) == {'retrying': 1, 'sent': 1, 'failed': 1}
+    assert 0 < redis_connection.ttl(ledger._day_key()) <= 7 * 86400
+
+
+def send(**kwargs):
+    return send_scheduled_email('user@example.com', 'Subject', 'Body', delivery_id='job-1', **kwargs)
+
+
+def ledger_status(connection):
+    ledger = DeliveryLedger(connection)
+    return ledger.get('job-1', ledger._day_key().rsplit(':', 1)[-1])
+
+
+def scheduled_jobs(connection):
+    return list(Scheduler(queue_name='default', connection=connection).get_jobs())
+
+
+def test_send_records_the_outcome(redis_connection):
+    send()
+
+    assert len(mail.outbox) == 1
+    assert ledger_status(redis_connection)['status'] == 'sent'
+    assert redis_connection.lrange(EVENTS_KEY, 0, -1)[-1].startswith(b'job-1|sent|')
+
+
+def test_greylisting_is_retried_without_counting_towards_the_breaker(redis_connection):
+    breaker = CircuitBreaker(redis_connection)
+
+    with mock.patch('app.tasks.EmailMultiAlternatives.send', side_effect=GREYLISTED):
+        for _ in range(5):
+            with pytest.raises(TransientMailError):
+                send()
+
+    assert breaker.before_send() is False
+    assert [job.kwargs['attempt'] for job in scheduled_jobs(redis_connection)] == [2] * 5
+    assert ledger_status(redis_connection)['status'] == 'retrying'
+
+
+def test_connection_failures_trip_the_breaker(redis_connection):
+    breaker = CircuitBreaker(redis_connection)
+
+    with mock.patch('app.tasks.EmailMultiAlternatives.send', side_effect=ConnectionRefusedError()):
+        for _ in range(3):
+            with pytest.raises(TransientMailError):
+                send()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_send()
+
+
+def test_open_circuit_defers_without_failing_the_job(redis_connection):
+    redis_connection.set(CircuitBreaker(redis_connection).open_key, 1, ex=60)
+
+    with mock.patch('app.tasks.EmailMultiAlternatives.send') as send_mail:
+        assert send(attempt=2) is None
+
+    send_mail.assert_not_called()
+    assert [job.kwargs['attempt'] for job in scheduled_jobs(redis_connection)] == [2]
+    assert ledger_status(redis_connection)['status'] == 'retrying'
+
+
+def test_gives_up_after_max_attempts(redis_connection):
+    with mock.patch('app.tasks.EmailMultiAlternatives.send', side_effect=ConnectionRefusedError()):
+        with pytest.raises(TransientMailError):
+            send(attempt=3)
+
+    assert scheduled_jobs(redis_connection) == []
+    assert ledger_status(redis_connection)['status'] == 'failed'
+
+
+def test_permanent_failures_are_not_retried(redis_connection):
+    refused = smtplib.SMTPRecipientsRefused({'user@example.com': (550, b'No such user')})
+
+    with mock.patch('app.tasks.EmailMultiAlternatives.send', side_effect=refused):
+        with pytest.raises(PermanentMailError):
+            send()
+
+    assert scheduled_jobs(redis_connection) == []
+    assert ledger_status(redis_connection)['status'] == 'failed'
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import pytest
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+from app.consumers import DeliveryStatusConsumer
+from app.events import EVENTS_KEY, WATCHED_KEY, EventRelay, campaign_group, job_group, publish_delivery_event, watch_jobs
+
+MAIL_EVENTS = {'WATCH_TTL': 60, 'MAX_SUBSCRIPTIONS': 3, 'MAX_PENDING': 5}
+
+
+@pytest.fixture(autouse=True)
+def events_settings():
+    with override_settings(
+        MAIL_EVENTS=MAIL_EVENTS,
+        CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    ):
+        yield
+
+
+def test_pending_events_are_capped(redis_connection):
+    for i in range(8):
+        publish_delivery_event(redis_connection, f'job-{i}', 'sent', 'newsletter')
+
+    events = redis_connection.lrange(EVENTS_KEY, 0, -1)
+    assert [event.split(b'|')[0] for event in events] == [f'job-{i}'.encode() for i in range(3, 8)]
+
+
+def test_relay_coalesces_events_into_frames(redis_connection):
+    channel_layer = get_channel_layer()
+
+    async def receive_frames():
+        campaign_channel = await channel_layer.new_channel()
+        job_channel = await channel_layer.new_channel()
+        unwatched_channel = await channel_layer.new_channel()
+        await channel_layer.group_add(campaign_group('newsletter'), campaign_channel)
+        await channel_layer.group_add(job_group('job-1'), job_channel)
+        await channel_layer.group_add(job_group('job-2'), unwatched_channel)
+        return campaign_channel, job_channel, unwatched_channel
+
+    campaign_channel, job_channel, unwatched_channel = asyncio.run(receive_frames())
+    watch_jobs(redis_connection, ['job-1'])
+    for job_id, status in [('job-1', 'retrying'), ('job-1', 'sent'), ('job-2', 'failed'), ('job-3', 'sent')]:
+        publish_delivery_event(redis_connection, job_id, status, 'newsletter')
+
+    relay = EventRelay(redis_connection)
+    relay.channel_layer = channel_layer
+    assert relay.relay_once() == 4
+    assert relay.relay_once() == 0
+
+    async def drain():
+        campaign = await channel_layer.receive(campaign_channel)
+        job = await channel_layer.receive(job_channel)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(channel_layer.receive(unwatched_channel), 0.05)
+        return campaign['frame'], job['frame']
+
+    campaign_frame, job_frame = asyncio.run(drain())
+    assert campaign_frame == {
+        'campaign': 'newsletter',
+        'counts': {'retrying': 1, 'sent': 2, 'failed': 1},
+        'failed': ['job-2'],
+    }
+    assert job_frame['job_id'] == 'job-1'
+    assert [event['status'] for event in job_frame['events']] == ['retrying', 'sent']
+
+
+def subscribe(*messages):
+    async def run():
+        communicator = WebsocketCommunicator(DeliveryStatusConsumer.as_asgi(), '/ws/mail-status/')
+        connected, _ = await communicator.connect()
+        assert connected
+        replies = []
+        for message in messages:
+            await communicator.send_to(text_data=json.dumps(message))
+            replies.append(await communicator.receive_json_from())
+        await communicator.disconnect()
+        return replies
+
+    return asyncio.run(run())
+
+
+JOB_IDS_ERROR = {'error': "'job_ids' must be a list of strings."}
+ACTION_ERROR = {'error': "Unknown action, expected 'subscribe'."}
+
+
+@pytest.mark.parametrize('frame, error', [
+    ({'action': 'subscribe', 'job_ids': 'job-1'}, JOB_IDS_ERROR),
+    ({'action': 'subscribe', 'job_ids': 5}, JOB_IDS_ERROR),
+    ({'action': 'subscribe', 'job_ids': [1, 2]}, JOB_IDS_ERROR),
+    ({'action': 'subscribe', 'job_ids': {'job': 'job-1'}}, JOB_IDS_ERROR),
+    (['subscribe'], ACTION_ERROR),
+    ('subscribe', ACTION_ERROR),
+    (None, ACTION_ERROR),
+    ({'action': 'unsubscribe'}, ACTION_ERROR),
+])
+def test_subscribe_rejects_malformed_frames(redis_connection, frame, error):
+    replies = subscribe(frame, {'action': 'subscribe', 'campaign': 'newsletter'})
+
+    assert replies == [error, {'subscribed': ['mail.campaign.newsletter']}]
+    assert not redis_connection.exists(WATCHED_KEY)
+
+
+def test_subscribe_watches_jobs(redis_connection):
+    replies = subscribe({'action': 'subscribe', 'job_ids': ['job-1', 'bad id!'], 'campaign': 'newsletter'})
+
+    assert replies == [{'subscribed': ['mail.campaign.newsletter', 'mail.job.job-1']}]
+    assert redis_connection.zscore(WATCHED_KEY, 'job-1') is not None
+
+
+def test_subscribe_limits_subscriptions(redis_connection):
+    replies = subscribe({'action': 'subscribe', 'job_ids': ['a', 'b', 'c', 'd']})
+
+    assert replies == [{'error': 'Too many subscriptions.'}]
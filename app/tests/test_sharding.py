@@ -0,0 +1,164 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+import fakeredis
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from rq import Queue
+from rq_scheduler import Scheduler
+from app import scheduling
+from app.management.commands import reshard_mail_jobs
+from app.sharding import HashRing, routing_key, shard_node_name
+from app.tasks import send_scheduled_email
+
+SHARD_A = 'redis://:password@redis-a:6379/0'
+SHARD_B = 'redis://:password@redis-b:6379/0'
+SHARD_C = 'redis://:password@redis-c:6379/0'
+SHARD_D = 'redis://:password@redis-d:6379/0'
+
+KEYS = [str(uuid.UUID(int=i)) for i in range(5000)]
+
+
+def owners(urls, keys=KEYS):
+    ring = HashRing(urls)
+    return {key: urls[ring.get(key)] for key in keys}
+
+
+def test_shard_node_name_ignores_credentials():
+    assert shard_node_name(SHARD_A) == 'redis-a:6379/0'
+    assert shard_node_name('redis://redis-a') == 'redis-a:6379/0'
+
+
+def test_ring_spreads_keys_over_every_shard():
+    counts = {}
+    for url in owners([SHARD_A, SHARD_B, SHARD_C]).values():
+        counts[url] = counts.get(url, 0) + 1
+
+    assert set(counts) == {SHARD_A, SHARD_B, SHARD_C}
+    assert all(count > len(KEYS) * 0.25 for count in counts.values())
+
+
+def test_ring_owner_does_not_depend_on_shard_order():
+    assert owners([SHARD_A, SHARD_B, SHARD_C]) == owners([SHARD_C, SHARD_A, SHARD_B])
+
+
+def test_removing_a_shard_only_moves_its_keys():
+    before = owners([SHARD_A, SHARD_B, SHARD_C])
+    after = owners([SHARD_A, SHARD_C])
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+    assert moved == {key for key in KEYS if before[key] == SHARD_B}
+
+
+def test_adding_a_shard_moves_about_a_quarter_of_the_keys():
+    before = owners([SHARD_A, SHARD_B, SHARD_C])
+    after = owners([SHARD_A, SHARD_B, SHARD_C, SHARD_D])
+
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == SHARD_D for key in moved)
+    assert 0.15 < len(moved) / len(KEYS) < 0.35
+
+
+def test_routing_key():
+    assert routing_key('job_id', 'job-1', 'user@example.com') == 'job-1'
+    assert routing_key('domain', 'job-1', 'user@Example.COM') == 'example.com'
+
+
+def test_shard_for_keeps_a_domain_on_one_shard():
+    ring = HashRing([SHARD_A, SHARD_B, SHARD_C])
+    with override_settings(MAIL_SHARD_KEY='domain'):
+        shards = {
+            scheduling.shard_for(str(uuid.uuid4()), f'user{i}@example.com', ring)
+            for i in range(50)
+        }
+    assert len(shards) == 1
+
+
+def test_queue_names():
+    assert scheduling.shard_queue_name(0) == 'default'
+    assert scheduling.shard_queue_name(2, 'bulk') == 'bulk-shard2'
+    assert scheduling.lane_for_queue('bulk-shard2') == 'bulk'
+    assert scheduling.lane_for_queue('transactional') == 'transactional'
+
+
+@pytest.fixture
+def fake_shards():
+    servers = {}
+
+    def from_url(url, **kwargs):
+        return fakeredis.FakeRedis(server=servers.setdefault(url, fakeredis.FakeServer()))
+
+    def use(urls):
+        scheduling._connections.clear()
+        scheduling._ring = None
+        return override_settings(REDIS_SHARDS=urls)
+
+    with mock.patch.object(scheduling.Redis, 'from_url', side_effect=from_url), \
+            mock.patch.object(reshard_mail_jobs.Redis, 'from_url', side_effect=from_url):
+        yield from_url, use
+
+    scheduling._connections.clear()
+    scheduling._ring = None
+
+
+def assert_jobs_at_home(from_url, urls):
+    ring = HashRing(urls)
+    total = 0
+    for index, url in enumerate(urls):
+        connection = from_url(url)
+        for job in Scheduler(connection=connection).get_jobs():
+            target = scheduling.shard_for(job.id, job.args[0], ring)
+            assert target == index
+            assert job.origin == scheduling.shard_queue_name(index, scheduling.lane_for_queue(job.origin))
+            total += 1
+        for queue in Queue.all(connection=connection):
+            for job in queue.jobs:
+                assert scheduling.shard_for(job.id, job.args[0], ring) == index
+                assert queue.name == scheduling.shard_queue_name(index, scheduling.lane_for_queue(queue.name))
+                total += 1
+    return total
+
+
+def test_reshard_rehomes_jobs_after_a_middle_shard_is_removed(fake_shards):
+    from_url, use = fake_shards
+    scheduled_time = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    with use([SHARD_A, SHARD_B, SHARD_C]):
+        for i in range(60):
+            scheduling.schedule_mail(
+                scheduled_time, send_scheduled_email, f'user{i}@example.com', 'Subject', 'Body',
+                priority='bulk' if i % 2 else 'default'
+            )
+        for index in range(3):
+            for i in range(5):
+                job_id = str(uuid.uuid4())
+                scheduling.get_queue(index, 'transactional').enqueue(
+                    send_scheduled_email, f'queued{index}-{i}@example.com', 'Subject', 'Body', job_id=job_id
+                )
+
+    stranded = [job for job in Scheduler(connection=from_url(SHARD_C)).get_jobs()]
+    assert stranded and all(job.origin.endswith('-shard2') for job in stranded)
+
+    with use([SHARD_A, SHARD_C]):
+        call_command('reshard_mail_jobs', '--drain', SHARD_B, stdout=mock.Mock())
+
+        assert assert_jobs_at_home(from_url, [SHARD_A, SHARD_C]) == 75
+        assert not list(Scheduler(connection=from_url(SHARD_B)).get_jobs())
+        assert not Queue('default-shard2', connection=from_url(SHARD_C)).count
+
+
+def test_reshard_dry_run_moves_nothing(fake_shards):
+    from_url, use = fake_shards
+    scheduled_time = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    with use([SHARD_A, SHARD_B]):
+        for i in range(20):
+            scheduling.schedule_mail(scheduled_time, send_scheduled_email, f'user{i}@example.com', 'Subject', 'Body')
+
+    with use([SHARD_A, SHARD_B, SHARD_C]):
+        call_command('reshard_mail_jobs', '--dry-run', stdout=mock.Mock())
+
+    counts = [len(list(Scheduler(connection=from_url(url)).get_jobs())) for url in (SHARD_A, SHARD_B, SHARD_C)]
+    assert counts[0] + counts[1] == 20
+    assert counts[2] == 0
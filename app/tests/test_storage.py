@@ -0,0 +1,102 @@
+import os
+from unittest import mock
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from app import storage
+from app.delivery import classify_error
+from app.exceptions import MailAssetCacheError, PermanentMailError, TransientMailError
+from app.storage import MailAssetCache
+
+
+@pytest.fixture
+def remote(tmp_path):
+    file_storage = FileSystemStorage(location=tmp_path / 'remote')
+    with mock.patch.object(storage, 'default_storage', file_storage):
+        yield file_storage
+
+
+def store(remote, name, size):
+    return remote.save(f'mail-assets/{name}', ContentFile(name[0].encode('ascii') * size))
+
+
+def cached_files(cache):
+    return sorted(os.listdir(cache.directory))
+
+
+def test_content_addressed_keys(remote):
+    first = storage.store_html_body('<p>Hi</p>')
+    second = storage.store_html_body('<p>Hi</p>')
+
+    assert first == second
+    assert remote.exists(first)
+
+
+def test_read_fetches_once_and_serves_from_disk(remote, tmp_path):
+    key = store(remote, 'a', 10)
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=100)
+
+    assert cache.read_bytes(key) == b'a' * 10
+    remote.delete(key)
+    assert cache.read_bytes(key) == b'a' * 10
+
+
+def test_evicts_least_recently_used_files(remote, tmp_path):
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=25)
+    keys = [store(remote, name, 10) for name in ('a', 'b', 'c')]
+
+    cache.read_bytes(keys[0])
+    cache.read_bytes(keys[1])
+    os.utime(cache._local_path(keys[0]), (1, 1))
+    cache.read_bytes(keys[2])
+
+    assert cached_files(cache) == sorted(os.path.basename(cache._local_path(key)) for key in keys[1:])
+
+
+def test_keeps_a_just_fetched_file_over_the_budget(remote, tmp_path):
+    key = store(remote, 'big', 100)
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=10)
+
+    assert cache.read_bytes(key) == b'b' * 100
+    assert cached_files(cache) == [os.path.basename(cache._local_path(key))]
+
+
+def test_open_handle_survives_eviction_by_another_process(remote, tmp_path):
+    key = store(remote, 'a', 10)
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=100)
+    cache.read_bytes(key)
+
+    with cache.open(key) as local_file:
+        os.remove(cache._local_path(key))
+        assert local_file.read() == b'a' * 10
+
+
+def test_refetches_a_file_evicted_between_reads(remote, tmp_path):
+    key = store(remote, 'a', 10)
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=100)
+    cache.read_bytes(key)
+    os.remove(cache._local_path(key))
+
+    assert cache.read_bytes(key) == b'a' * 10
+
+
+def test_missing_asset_is_permanent(remote, tmp_path):
+    cache = MailAssetCache(str(tmp_path / 'cache'), max_bytes=100)
+
+    with pytest.raises(FileNotFoundError) as excinfo:
+        cache.read_bytes('mail-assets/missing')
+
+    assert isinstance(classify_error(excinfo.value), PermanentMailError)
+    assert cached_files(cache) == []
+
+
+def test_unusable_cache_directory_is_transient(remote, tmp_path):
+    key = store(remote, 'a', 10)
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_bytes(b'')
+    cache = MailAssetCache(str(blocker / 'cache'), max_bytes=100)
+
+    with pytest.raises(MailAssetCacheError) as excinfo:
+        cache.read_bytes(key)
+
+    assert isinstance(classify_error(excinfo.value), TransientMailError)
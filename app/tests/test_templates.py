@@ -0,0 +1,69 @@
+import warnings
+from io import StringIO
+from unittest import mock
+import pytest
+from django.core.management import call_command
+from app import rendering
+from app.models import MailTemplate
+from app.rendering import render_mail
+from app.serializers import MailTemplateSerializer
+
+
+def test_models_and_migrations_are_in_sync():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        call_command('makemigrations', 'app', '--check', '--dry-run', stdout=StringIO())
+
+
+def template_data(**fields):
+    return {'name': 'welcome', 'subject': 'Hi {{ name }}', 'body': 'Hello {{ name }}', **fields}
+
+
+def test_template_serializer_accepts_valid_templates():
+    serializer = MailTemplateSerializer(data=template_data(html_body='<p>{{ name }}</p>'))
+
+    assert serializer.is_valid(), serializer.errors
+
+
+@pytest.mark.parametrize('field, source', [
+    ('subject', 'Hi {{ name|nofilter }}'),
+    ('body', '{% bogus %}'),
+    ('html_body', '{% if name %}<p>unclosed</p>'),
+])
+def test_template_serializer_rejects_syntax_errors(field, source):
+    serializer = MailTemplateSerializer(data=template_data(**{field: source}))
+
+    assert not serializer.is_valid()
+    assert list(serializer.errors) == [field]
+    assert serializer.errors[field][0].startswith('Template syntax error')
+
+
+@pytest.fixture
+def stored_template():
+    template = MailTemplate(
+        pk=1,
+        name='welcome',
+        version=2,
+        subject='Hi {{ name }},\n welcome',
+        body='Hello {{ name }} & co',
+        html_body='<p>Hello {{ name }}</p>',
+    )
+    rendering.get_compiled_template.cache_clear()
+    with mock.patch.object(MailTemplate.objects, 'get', return_value=template) as get:
+        yield get
+    rendering.get_compiled_template.cache_clear()
+
+
+def test_render_mail_escapes_only_html(stored_template):
+    subject, body, html_body = render_mail(1, 2, {'name': '<Ann>'})
+
+    assert subject == 'Hi <Ann>, welcome'
+    assert body == 'Hello <Ann> & co'
+    assert html_body == '<p>Hello &lt;Ann&gt;</p>'
+
+
+def test_compiled_templates_are_cached_per_version(stored_template):
+    for name in ('Ann', 'Bob', 'Cem'):
+        render_mail(1, 2, {'name': name})
+
+    stored_template.assert_called_once_with(pk=1, version=2)
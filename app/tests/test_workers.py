@@ -0,0 +1,127 @@
+import time
+from collections import Counter
+from datetime import timezone
+from unittest import mock
+import pytest
+from django.test import override_settings
+from rq import Queue
+from rq_scheduler import Scheduler
+from app import workers
+from app.delivery import LaneLatencyRecorder, histogram_percentile
+from app.exceptions import TransientMailError
+from app.tasks import send_scheduled_email
+from app.workers import WeightedLaneWorker
+
+MAIL_LANES = {
+    'transactional': {'WEIGHT': 8, 'TIMEOUT': 60},
+    'default': {'WEIGHT': 3, 'TIMEOUT': 360},
+    'bulk': {'WEIGHT': 1, 'TIMEOUT': 360},
+}
+
+
+@pytest.fixture
+def clock():
+    now = [1000.0]
+    with mock.patch.object(workers.time, 'monotonic', side_effect=lambda: now[0]):
+        yield now
+
+
+@pytest.fixture
+def worker(redis_connection, clock):
+    with override_settings(MAIL_LANES=MAIL_LANES, MAIL_LANE_MAX_WAIT=30):
+        queues = [Queue(name, connection=redis_connection) for name in ('bulk-shard1', 'default-shard1', 'transactional-shard1')]
+        yield WeightedLaneWorker(queues, connection=redis_connection)
+
+
+def serve(worker, clock, dequeues, step=0.1):
+    served = []
+    for _ in range(dequeues):
+        queue = worker._ordered_queues[0]
+        served.append(queue.name)
+        clock[0] += step
+        worker.reorder_queues(reference_queue=queue)
+    return served
+
+
+def test_lanes_are_served_in_proportion_to_their_weights(worker, clock):
+    served = serve(worker, clock, 24)
+
+    assert Counter(served) == {'transactional-shard1': 16, 'default-shard1': 6, 'bulk-shard1': 2}
+
+
+def test_low_weight_lanes_are_interleaved(worker, clock):
+    served = serve(worker, clock, 12)
+
+    assert served.count('bulk-shard1') == 1
+    assert 'transactional-shard1,' * 4 not in ','.join(served) + ','
+
+
+def test_every_lane_stays_in_the_dequeue_order(worker, clock):
+    serve(worker, clock, 5)
+
+    assert sorted(queue.name for queue in worker._ordered_queues) == [
+        'bulk-shard1', 'default-shard1', 'transactional-shard1'
+    ]
+
+
+def test_starved_lane_goes_first(worker, clock):
+    serve(worker, clock, 3)
+    worker.lane_served_at['bulk'] = clock[0] - 31
+    worker.reorder_queues(reference_queue=worker._ordered_queues[0])
+
+    assert worker._ordered_queues[0].name == 'bulk-shard1'
+
+
+def test_histogram_percentile():
+    histogram = {'le_250': 50, 'le_1000': 45, 'le_60000': 4, 'le_inf': 1}
+
+    assert histogram_percentile({}, 50) is None
+    assert histogram_percentile(histogram, 50) == 250
+    assert histogram_percentile(histogram, 95) == 1000
+    assert histogram_percentile(histogram, 99) == 60000
+    assert histogram_percentile(histogram, 100) == float('inf')
+
+
+def test_lane_latency_recorder_sums_recent_minutes(redis_connection):
+    recorder = LaneLatencyRecorder(redis_connection)
+
+    with mock.patch('app.delivery.time.time', return_value=1_700_000_000):
+        recorder.record('bulk', 120)
+        recorder.record('bulk', 4000)
+    with mock.patch('app.delivery.time.time', return_value=1_700_000_060):
+        recorder.record('bulk', 200)
+        recorder.record('transactional', 90)
+        assert recorder.histogram('bulk', 2) == {'le_250': 2, 'le_5000': 1}
+        assert recorder.histogram('bulk', 1) == {'le_250': 1}
+
+
+@pytest.fixture
+def current_job(redis_connection):
+    job = mock.Mock(
+        id='job-1',
+        origin='transactional',
+        connection=redis_connection,
+        timeout=60,
+        meta={'scheduled_for': time.time() - 3600},
+    )
+    with mock.patch('app.tasks.get_current_job', return_value=job), \
+            override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        yield job
+
+
+def test_retry_moves_the_due_time_to_the_retry(redis_connection, current_job):
+    with mock.patch('app.tasks.EmailMultiAlternatives.send', side_effect=ConnectionRefusedError()):
+        with pytest.raises(TransientMailError):
+            send_scheduled_email('user@example.com', 'Subject', 'Body')
+
+    [(retry, due_at)] = Scheduler(connection=redis_connection).get_jobs(with_times=True)
+    assert retry.meta['scheduled_for'] == pytest.approx(due_at.replace(tzinfo=timezone.utc).timestamp(), abs=1)
+    assert retry.meta['scheduled_for'] > time.time()
+
+
+def test_lane_latency_runs_from_the_due_time_of_the_sending_attempt(redis_connection, current_job):
+    current_job.meta['scheduled_for'] = time.time() - 0.2
+
+    send_scheduled_email('user@example.com', 'Subject', 'Body', attempt=3)
+
+    assert LaneLatencyRecorder(redis_connection).histogram('transactional', 1) == {'le_250': 1}
@@ -1,6 +1,7 @@
 from django.urls import path
-from app.views import ScheduleMailView
+from app.views import ScheduleMailView, MailTemplateView
 
 urlpatterns = [
     path('schedule-mail/', ScheduleMailView.as_view(), name='schedule-mail'),
+    path('mail-templates/', MailTemplateView.as_view(), name='mail-templates'),
 ]
\ No newline at end of file
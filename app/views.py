@@ -1,15 +1,15 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
+from django.db import IntegrityError
 from django.utils import timezone
-from app.serializers import ScheduleMailSerializer
+from app.models import MailTemplate
+from app.serializers import ScheduleMailSerializer, MailTemplateSerializer
 from app.tasks import send_scheduled_email
-
-from django_rq import get_queue
-from rq_scheduler import Scheduler
-from redis import Redis
-from decouple import config
+from app.scheduling import get_redis_connection, schedule_mail
+from app.events import publish_delivery_event
+from app.storage import store_html_body, store_attachment
 
 class ScheduleMailView(APIView):
     permission_classes = [AllowAny]
@@ -21,35 +21,69 @@ class ScheduleMailView(APIView):
             data = serializer.validated_data
             
             recipient_email = data['recipient_email']
-            subject = data['subject']
-            message = data['message']
+            subject = data.get('subject')
+            message = data.get('message')
             scheduled_time = data['scheduled_time']
+            campaign = data.get('campaign')
             
-            queue = get_queue('default')
-
-            redis_connection = Redis(
-                host=config('REDIS_HOST'),
-                port=config('REDIS_PORT', cast=int),
-                db=config('REDIS_DB', cast=int),
-                password=config('REDIS_PASSWORD'),
-                socket_timeout=5
-            )
-
-            scheduler = Scheduler(connection=redis_connection)
+            html_key = None
+            if data.get('html_message'):
+                html_key = store_html_body(data['html_message'])
+            
+            attachments = [store_attachment(attachment) for attachment in data.get('attachments', [])]
 
-            job = scheduler.enqueue_at(
+            job = schedule_mail(
                 scheduled_time, 
                 send_scheduled_email, 
                 recipient_email, 
                 subject, 
-                message
+                message,
+                html_key=html_key,
+                attachments=attachments,
+                template_id=data.get('template_id'),
+                template_version=data.get('template_version'),
+                context=data.get('context'),
+                campaign=campaign,
+                priority=data['priority'],
+                job_result_ttl=0
             )
             
+            publish_delivery_event(get_redis_connection(), job.id, 'scheduled', campaign)
+            
             return Response({
                 'message': 'Mail was scheduled successfully',
                 'recipient_email': recipient_email,
                 'scheduled_time': scheduled_time,
+                'campaign': campaign,
+                'priority': data['priority'],
                 'job_id': job.id 
             }, status=status.HTTP_201_CREATED)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class MailTemplateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        templates = MailTemplate.objects.all()
+        if request.query_params.get('name'):
+            templates = templates.filter(name=request.query_params['name'])
+
+        return Response(MailTemplateSerializer(templates, many=True).data, status=status.HTTP_200_OK)
+
+    def post(self, request, *args, **kwargs):
+        serializer = MailTemplateSerializer(data=request.data)
+
+        if serializer.is_valid():
+            try:
+                serializer.save()
+            except IntegrityError:
+                return Response(
+                    {'version': ['A newer version was created concurrently, retry the request.']},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,42 @@
+import time
+from django.conf import settings
+from rq import SimpleWorker
+from app.scheduling import lane_for_queue
+
+
+class WeightedLaneWorker(SimpleWorker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lane_weights = {
+            lane: options['WEIGHT'] for lane, options in settings.MAIL_LANES.items()
+        }
+        self.lane_credits = {lane: 0 for lane in self.lane_weights}
+        self.lane_served_at = {lane: time.monotonic() for lane in self.lane_weights}
+        self.reorder_queues(reference_queue=None)
+
+    def _weight(self, queue):
+        return self.lane_weights.get(lane_for_queue(queue.name), 1)
+
+    def reorder_queues(self, reference_queue):
+        now = time.monotonic()
+        if reference_queue is not None:
+            self.lane_served_at[lane_for_queue(reference_queue.name)] = now
+
+        total = sum(self.lane_weights.values())
+        for lane, weight in self.lane_weights.items():
+            self.lane_credits[lane] += weight
+        next_lane = max(self.lane_credits, key=self.lane_credits.get)
+        self.lane_credits[next_lane] -= total
+
+        max_wait = settings.MAIL_LANE_MAX_WAIT
+
+        def rank(queue):
+            lane = lane_for_queue(queue.name)
+            waited = now - self.lane_served_at.get(lane, now)
+            if waited > max_wait:
+                return (0, -waited)
+            if lane == next_lane:
+                return (1, 0)
+            return (2, -self._weight(queue))
+
+        self._ordered_queues = sorted(self.queues, key=rank)
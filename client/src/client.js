@@ -1,6 +1,7 @@
 import axios from "axios";
 
 const API_BASE_URL = "http://localhost/api";
+export const WS_BASE_URL = "ws://localhost/ws";
 
 const client = axios.create({
   baseURL: API_BASE_URL,
@@ -1,5 +1,7 @@
 import { defineStore } from "pinia";
-import client from "@/client.js";
+import client, { WS_BASE_URL } from "@/client.js";
+
+let statusSocket = null;
 
 export const useMailSchedulerStore = defineStore("mailScheduler", {
   state: () => ({
@@ -17,6 +19,7 @@ export const useMailSchedulerStore = defineStore("mailScheduler", {
       message: "",
       scheduled_time: "",
     },
+    jobStatuses: {},
   }),
 
   actions: {
@@ -36,6 +39,7 @@ export const useMailSchedulerStore = defineStore("mailScheduler", {
         const response = await client.post("schedule-mail/", mailData);
         this.success = true;
         this.showSnackbar("Mail scheduled successfully!", "success");
+        this.subscribeToJob(response.data.job_id);
         return response.data;
       } catch (error) {
         let errorMessage = "An error occurred while scheduling email";
@@ -60,6 +64,41 @@ export const useMailSchedulerStore = defineStore("mailScheduler", {
       }
     },
 
+    subscribeToJob(jobId) {
+      this.jobStatuses[jobId] = "scheduled";
+      const message = JSON.stringify({ action: "subscribe", job_ids: [jobId] });
+
+      if (statusSocket && statusSocket.readyState === WebSocket.OPEN) {
+        statusSocket.send(message);
+        return;
+      }
+
+      if (!statusSocket || statusSocket.readyState === WebSocket.CLOSED) {
+        statusSocket = new WebSocket(`${WS_BASE_URL}/mail-status/`);
+        statusSocket.onmessage = (event) => this.handleStatusFrame(JSON.parse(event.data));
+        statusSocket.onclose = () => {
+          statusSocket = null;
+        };
+      }
+
+      statusSocket.addEventListener("open", () => statusSocket.send(message), { once: true });
+    },
+
+    handleStatusFrame(frame) {
+      if (!frame.job_id || !frame.events?.length) {
+        return;
+      }
+
+      const { status } = frame.events[frame.events.length - 1];
+      this.jobStatuses[frame.job_id] = status;
+
+      if (status === "sent") {
+        this.showSnackbar("Scheduled mail was sent.", "success");
+      } else if (status === "failed") {
+        this.showSnackbar("Scheduled mail could not be sent.", "error");
+      }
+    },
+
     showSnackbar(message, color = "success") {
       this.snackbar = {
         show: true,
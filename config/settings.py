@@ -20,6 +20,7 @@ INSTALLED_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
+    'channels',
     'corsheaders',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -66,6 +67,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 DATABASES = {
     "default": {
@@ -86,12 +88,16 @@ MONGO_PASSWORD = config('MONGO_ROOT_PASSWORD', default="password", cast=str)
 
 MONGO_URI = f"mongodb://{MONGO_USERNAME}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}/"
 
+REDIS_URL = f'redis://:{config('REDIS_PASSWORD')}@{config('REDIS_HOST')}:{config('REDIS_PORT', default=6379, cast=int)}/{config('REDIS_DB')}'
+REDIS_SHARDS = config('REDIS_SHARDS', default=REDIS_URL, cast=Csv())
+MAIL_SHARD_KEY = config('MAIL_SHARD_KEY', default='job_id', cast=str)
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": f'redis://:{config('REDIS_PASSWORD')}@{config('REDIS_HOST')}/{config('REDIS_DB')}',
+        "LOCATION": REDIS_SHARDS if len(REDIS_SHARDS) > 1 else REDIS_SHARDS[0],
         "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "CLIENT_CLASS": "django_redis.client.ShardClient" if len(REDIS_SHARDS) > 1 else "django_redis.client.DefaultClient",
             "CONNECTION_POOL_KWARGS": {
                 "max_connections": 200,
             },
@@ -112,20 +118,41 @@ CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
-            "hosts": [f'redis://:{config('REDIS_PASSWORD')}@{config('REDIS_HOST')}/{config('REDIS_DB')}'],
+            "hosts": REDIS_SHARDS,
         },
     },
 }
 
-RQ_QUEUES = {
+MAIL_EVENTS = {
+    'WATCH_TTL': 86400,
+    'MAX_SUBSCRIPTIONS': 1000,
+    'MAX_PENDING': config('MAIL_EVENTS_MAX_PENDING', default=100000, cast=int),
+}
+
+MAIL_LANES = {
+    'transactional': {
+        'WEIGHT': config('MAIL_LANE_TRANSACTIONAL_WEIGHT', default=8, cast=int),
+        'TIMEOUT': 60,
+    },
     'default': {
-        'HOST': config('REDIS_HOST'),
-        'PORT': 6379,
-        'DB': config('REDIS_DB'),
-        'PASSWORD': config('REDIS_PASSWORD'),
-        'DEFAULT_TIMEOUT': 360,
+        'WEIGHT': config('MAIL_LANE_DEFAULT_WEIGHT', default=3, cast=int),
+        'TIMEOUT': 360,
+    },
+    'bulk': {
+        'WEIGHT': config('MAIL_LANE_BULK_WEIGHT', default=1, cast=int),
+        'TIMEOUT': 360,
     },
 }
+MAIL_LANE_MAX_WAIT = config('MAIL_LANE_MAX_WAIT', default=30, cast=int)
+
+RQ_QUEUES = {
+    (lane if index == 0 else f'{lane}-shard{index}'): {
+        'URL': url,
+        'DEFAULT_TIMEOUT': lane_options['TIMEOUT'],
+    }
+    for index, url in enumerate(REDIS_SHARDS)
+    for lane, lane_options in MAIL_LANES.items()
+}
 
 
 TIME_ZONE = "Europe/Istanbul"
@@ -135,6 +162,56 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') 
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default="", cast=str)
+
+if AWS_STORAGE_BUCKET_NAME:
+    DEFAULT_STORAGE = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            "bucket_name": AWS_STORAGE_BUCKET_NAME,
+            "access_key": config('AWS_ACCESS_KEY_ID', default=None),
+            "secret_key": config('AWS_SECRET_ACCESS_KEY', default=None),
+            "region_name": config('AWS_S3_REGION_NAME', default=None),
+            "endpoint_url": config('AWS_S3_ENDPOINT_URL', default=None),
+            "default_acl": None,
+            "querystring_auth": True,
+        },
+    }
+else:
+    DEFAULT_STORAGE = {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    }
+
+STORAGES = {
+    "default": DEFAULT_STORAGE,
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+MAIL_DELIVERY = {
+    'MAX_ATTEMPTS': config('MAIL_MAX_ATTEMPTS', default=5, cast=int),
+    'BACKOFF_BASE': config('MAIL_BACKOFF_BASE', default=30, cast=int),
+    'BACKOFF_CAP': config('MAIL_BACKOFF_CAP', default=3600, cast=int),
+    'RETRIED_FAILURE_TTL': 86400,
+    'CIRCUIT_FAILURE_THRESHOLD': config('MAIL_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int),
+    'CIRCUIT_WINDOW': 60,
+    'CIRCUIT_COOLDOWN': config('MAIL_CIRCUIT_COOLDOWN', default=60, cast=int),
+    'CIRCUIT_PROBE_TIMEOUT': 30,
+    'LEDGER_TTL_DAYS': config('MAIL_LEDGER_TTL_DAYS', default=7, cast=int),
+}
+
+MAIL_TEMPLATE_CACHE_SIZE = config('MAIL_TEMPLATE_CACHE_SIZE', default=256, cast=int)
+MAIL_TEMPLATE_CONTEXT_MAX_BYTES = 4096
+
+MAIL_ASSET_PREFIX = 'mail-assets'
+MAIL_ASSET_CACHE_DIR = config('MAIL_ASSET_CACHE_DIR', default=os.path.join(BASE_DIR, '.mail-asset-cache'), cast=str)
+MAIL_ASSET_CACHE_MAX_BYTES = config('MAIL_ASSET_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+MAIL_ATTACHMENT_MAX_BYTES = config('MAIL_ATTACHMENT_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 EMAIL_BACKEND = config('EMAIL_BACKEND', default="django.core.mail.backends.smtp.EmailBackend", cast=str)
@@ -239,6 +316,29 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_AGE = 3600
 
+LOG_BODY_CAPTURE = {
+    'MAX_BYTES': config('LOG_BODY_MAX_BYTES', default=10000, cast=int),
+    'REDACT_FIELDS': ['password', 'token', 'access', 'refresh', 'authorization', 'secret'],
+    'FIELD_LIMITS': {
+        'message': 256,
+        'html_message': 256,
+    },
+}
+
+LOG_SAMPLING = {
+    'RATES': {
+        '2xx': config('LOG_SAMPLE_RATE_2XX', default=0.01, cast=float),
+        '3xx': config('LOG_SAMPLE_RATE_3XX', default=0.01, cast=float),
+        '4xx': 1.0,
+        '5xx': 1.0,
+    },
+}
+
+LOG_ROLLUPS = {
+    'COLLECTION': 'api_rollups',
+    'FLUSH_INTERVAL': config('LOG_ROLLUP_FLUSH_INTERVAL', default=10, cast=int),
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -259,6 +359,7 @@ LOGGING = {
             'db_name': MONGO_DB_NAME,
             'batch_size': 10,
             'flush_interval': 2,   
+            'coalesce_window': config('LOG_COALESCE_WINDOW', default=60, cast=int),
         },
         'console': {
             'level': 'DEBUG',
@@ -0,0 +1,21 @@
+import os
+import django
+
+TEST_ENV = {
+    'DJANGO_SETTINGS_MODULE': 'config.settings',
+    'SECRET_KEY': 'test',
+    'ALLOWED_HOSTS': 'testserver',
+    'POSTGRES_DB': 'app',
+    'POSTGRES_USER': 'postgres',
+    'POSTGRES_PASSWORD': 'postgres',
+    'POSTGRES_HOST': 'localhost',
+    'POSTGRES_PORT': '5432',
+    'REDIS_HOST': 'localhost',
+    'REDIS_PASSWORD': 'password',
+    'REDIS_DB': '0',
+}
+
+for key, value in TEST_ENV.items():
+    os.environ.setdefault(key, value)
+
+django.setup()
@@ -0,0 +1,78 @@
+import json
+from collections.abc import Mapping
+
+REDACTED = '[REDACTED]'
+TRUNCATED_SUFFIX = '...[truncated]'
+
+
+class BodyCapture:
+    def __init__(self, max_bytes=10000, redact_fields=(), field_limits=None):
+        self.max_bytes = max_bytes
+        self.redact_fields = {field.lower() for field in redact_fields}
+        self.field_limits = {field.lower(): limit for field, limit in (field_limits or {}).items()}
+
+    def from_data(self, data):
+        if data is None:
+            return None
+        budget = [self.max_bytes]
+        return self._sanitize(data, None, budget)
+
+    def from_bytes(self, raw):
+        if not raw:
+            return None
+        if len(raw) > self.max_bytes:
+            return self.too_large(len(raw))
+        try:
+            return self.from_data(json.loads(raw))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+
+    def too_large(self, size):
+        return {'_message': 'Body too large to log', '_size': size}
+
+    def _sanitize(self, value, key, budget):
+        if budget[0] <= 0:
+            return TRUNCATED_SUFFIX
+
+        field = key.lower() if isinstance(key, str) else None
+
+        if field in self.redact_fields:
+            return REDACTED
+
+        if isinstance(value, str):
+            limit = min(self.field_limits.get(field, budget[0]), budget[0])
+            budget[0] -= min(len(value), limit)
+            if len(value) > limit:
+                return value[:limit] + TRUNCATED_SUFFIX
+            return value
+
+        if hasattr(value, 'lists'):
+            result = {}
+            for item_key, items in value.lists():
+                item = items[0] if len(items) == 1 else items
+                result[item_key] = self._sanitize(item, item_key, budget)
+            return result
+
+        if isinstance(value, Mapping):
+            return {
+                item_key: self._sanitize(item, item_key, budget)
+                for item_key, item in value.items()
+            }
+
+        if isinstance(value, (list, tuple)):
+            return [self._sanitize(item, key, budget) for item in value]
+
+        if value is None or isinstance(value, (bool, int, float)):
+            budget[0] -= 8
+            return value
+
+        if hasattr(value, 'read') and hasattr(value, 'name'):
+            budget[0] -= 64
+            return {
+                'name': value.name,
+                'size': getattr(value, 'size', None),
+                'content_type': getattr(value, 'content_type', None),
+            }
+
+        text = str(value)
+        return self._sanitize(text, key, budget)
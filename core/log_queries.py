@@ -0,0 +1,155 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient
+from django.conf import settings
+
+LOG_COLLECTIONS = ('api_logs', 'error_logs', 'django_request_logs', 'system_logs')
+
+PAYLOAD_FIELDS = ('request_data', 'response_data', 'exception')
+
+KEYSET_SORT = [('timestamp', -1), ('_id', -1)]
+
+FILTER_FIELDS = {
+    'tag': 'tag',
+    'category': 'category',
+    'request_id': 'request_id',
+    'path': 'request_path',
+    'status': 'response_status',
+}
+
+_client = None
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def get_log_database():
+    global _client
+    if _client is None:
+        _client = MongoClient(
+            settings.MONGO_URI,
+            maxPoolSize=20,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            socketTimeoutMS=30000,
+            readPreference='secondaryPreferred'
+        )
+    return _client[settings.MONGO_DB_NAME]
+
+
+def encode_cursor(document):
+    payload = json.dumps([document['timestamp'].isoformat(), str(document['_id'])])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, object_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(timestamp), ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursor(str(e))
+
+
+def build_time_range(params):
+    time_range = {}
+    if params.get('since') is not None:
+        time_range['$gte'] = params['since']
+    if params.get('until') is not None:
+        time_range['$lt'] = params['until']
+    return time_range
+
+
+def build_filter(params, cursor=None):
+    clauses = []
+
+    for param, field in FILTER_FIELDS.items():
+        value = params.get(param)
+        if value is not None:
+            clauses.append({field: value})
+
+    time_range = build_time_range(params)
+    if time_range:
+        clauses.append({'timestamp': time_range})
+
+    if cursor:
+        timestamp, object_id = decode_cursor(cursor)
+        clauses.append({
+            '$or': [
+                {'timestamp': {'$lt': timestamp}},
+                {'timestamp': timestamp, '_id': {'$lt': object_id}},
+            ]
+        })
+
+    if not clauses:
+        return {}
+    if len(clauses) == 1:
+        return clauses[0]
+    return {'$and': clauses}
+
+
+def build_projection(include_payload=False):
+    if include_payload:
+        return None
+    return {field: 0 for field in PAYLOAD_FIELDS}
+
+
+def serialize_document(document):
+    document['id'] = str(document.pop('_id'))
+    return document
+
+
+def find_page(collection_name, params, cursor=None, limit=50, include_payload=False):
+    collection = get_log_database()[collection_name]
+
+    documents = list(
+        collection.find(build_filter(params, cursor), build_projection(include_payload))
+        .sort(KEYSET_SORT)
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1])
+
+    return [serialize_document(doc) for doc in documents], next_cursor
+
+
+def iter_export(collection_name, params, include_payload=False, batch_size=500):
+    collection = get_log_database()[collection_name]
+
+    documents = (
+        collection.find(build_filter(params), build_projection(include_payload))
+        .sort(KEYSET_SORT)
+        .batch_size(batch_size)
+    )
+
+    try:
+        for document in documents:
+            yield json.dumps(serialize_document(document), default=str) + '\n'
+    finally:
+        documents.close()
+
+
+def find_rollups(params, limit=1440):
+    collection_name = getattr(settings, 'LOG_ROLLUPS', {}).get('COLLECTION', 'api_rollups')
+    collection = get_log_database()[collection_name]
+
+    query = {}
+    for field in ('route', 'tag', 'status_class'):
+        if params.get(field) is not None:
+            query[field] = params[field]
+
+    time_range = build_time_range(params)
+    if time_range:
+        query['minute'] = time_range
+
+    return list(
+        collection.find(query, {'_id': 0})
+        .sort([('minute', -1), ('route', 1)])
+        .limit(limit)
+    )
@@ -6,16 +6,19 @@ from django.utils import timezone
 import threading
 from pymongo.operations import InsertOne
 import traceback
+from core.log_queries import FILTER_FIELDS
 
 class AsyncMongoDBHandler(logging.Handler):
-    def __init__(self, db_name, batch_size=100, flush_interval=5):
+    def __init__(self, db_name, batch_size=100, flush_interval=5, coalesce_window=60):
         super().__init__()
         self.db_name = db_name
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.coalesce_window = coalesce_window
         self.client = None
         self.db = None
         self.log_queue = []
+        self.coalesced = {}
         self.last_flush = timezone.now()
         self.indexes_created = set()
         self._lock = threading.Lock()
@@ -64,6 +67,7 @@ class AsyncMongoDBHandler(logging.Handler):
                     import time
                     time.sleep(self.flush_interval)
                     with self._lock:
+                        self._release_coalesced()
                         if self.log_queue:
                             self._flush_logs()
             except Exception as e:
@@ -92,7 +96,8 @@ class AsyncMongoDBHandler(logging.Handler):
                 safe_attributes = [
                     'request_id', 'ip_address', 'user_agent',
                     'request_method', 'request_path', 'response_status', 'request_data', 
-                    'response_data', 'tag', 'category', 'action_type', 'success'
+                    'response_data', 'duration_ms', 'tag', 'category', 'action_type', 'success',
+                    'sample_rate'
                 ]
                 
                 for attr in safe_attributes:
@@ -109,6 +114,10 @@ class AsyncMongoDBHandler(logging.Handler):
                 collection_name = self._get_collection_name(record.name, record.levelname, log_entry.get('tag'))
                 log_entry['_collection'] = collection_name
                 
+                if getattr(record, 'coalesce', False):
+                    self._coalesce(log_entry)
+                    return
+                
                 self.log_queue.append(log_entry)
                 
                 if len(self.log_queue) >= self.batch_size:
@@ -117,6 +126,32 @@ class AsyncMongoDBHandler(logging.Handler):
         except Exception as e:
             pass
     
+    def _coalesce(self, log_entry):
+        key = (
+            log_entry['_collection'], log_entry['level'], log_entry['message'],
+            log_entry.get('tag'), log_entry.get('request_path'), log_entry.get('response_status')
+        )
+        
+        entry = self.coalesced.get(key)
+        if entry is None:
+            log_entry['coalesced'] = True
+            log_entry['count'] = 1
+            log_entry['first_seen'] = log_entry['timestamp']
+            log_entry['last_seen'] = log_entry['timestamp']
+            self.coalesced[key] = log_entry
+        else:
+            entry['count'] += 1
+            entry['last_seen'] = log_entry['timestamp']
+    
+    def _release_coalesced(self, force=False):
+        if not self.coalesced:
+            return
+        
+        now = timezone.now()
+        for key, entry in list(self.coalesced.items()):
+            if force or (now - entry['first_seen']).total_seconds() >= self.coalesce_window:
+                self.log_queue.append(self.coalesced.pop(key))
+    
     def _add_tag_metadata(self, log_entry):
         tag = log_entry.get('tag')
         category = log_entry.get('category')
@@ -199,7 +234,9 @@ class AsyncMongoDBHandler(logging.Handler):
             collection.create_index("requires_alert")
             
             collection.create_index([("timestamp", -1), ("tag", 1)])
-            collection.create_index([("category", 1), ("timestamp", -1)])
+            collection.create_index([("timestamp", -1), ("_id", -1)])
+            for field in FILTER_FIELDS.values():
+                collection.create_index([(field, 1), ("timestamp", -1), ("_id", -1)])
             collection.create_index([("main_tag", 1), ("sub_tag", 1)])
             collection.create_index([("priority", 1), ("timestamp", -1)])
             collection.create_index([("requires_alert", 1), ("timestamp", -1)])
@@ -208,8 +245,6 @@ class AsyncMongoDBHandler(logging.Handler):
                 collection.create_index("request_id")
                 collection.create_index("request_path")
                 collection.create_index("response_status")
-                collection.create_index([("request_path", 1), ("timestamp", -1)])
-                collection.create_index([("response_status", 1), ("timestamp", -1)])
                 collection.create_index([("tag", 1), ("response_status", 1)])
             
             elif collection_name == 'error_logs':
@@ -245,6 +280,7 @@ class AsyncMongoDBHandler(logging.Handler):
     def close(self):
         try:
             with self._lock:
+                self._release_coalesced(force=True)
                 if self.log_queue:
                     self._flush_logs()
         except Exception as e:
@@ -1,7 +1,12 @@
 import logging
-import json
+import time
 import uuid
+from django.conf import settings
+from django.http.request import RawPostDataException
 from django.utils.deprecation import MiddlewareMixin
+from rest_framework.request import Empty
+from core.capture import BodyCapture
+from core.rollups import get_rollup_aggregator, status_class
 
 api_logger = logging.getLogger('api_logs')
 
@@ -21,31 +26,38 @@ class LoggingMiddleware(MiddlewareMixin):
     }
     
     def process_request(self, request):
+        request.log_started_at = time.monotonic()
+        
         config = self._get_path_config(request)
         if not config:
             return None
         
-        if not config.get('log_request', False):
-            return None
-        
         request.log_id = str(uuid.uuid4())
         
         request.log_tag = config.get('tag')
         request.log_category = config.get('category')
         
-        self._log_request(request, config)
-        
         return None
     
     def process_response(self, request, response):
+        duration_ms = self._get_duration_ms(request)
         config = self._get_path_config(request)
+        
+        self._record_rollup(request, response, config, duration_ms)
+        
         if not config:
             return response
         
-        if not config.get('log_response', False):
+        if not self._is_sampled(request, response, config):
+            if config.get('log_response', False):
+                self._log_coalesced(request, response, config)
             return response
         
-        self._log_response(request, response, config)
+        if config.get('log_request', False):
+            self._log_request(request, response, config)
+        
+        if config.get('log_response', False):
+            self._log_response(request, response, config, duration_ms)
         
         return response
     
@@ -69,11 +81,11 @@ class LoggingMiddleware(MiddlewareMixin):
         
         return None
     
-    def _log_request(self, request, config):
+    def _log_request(self, request, response, config):
         try:
             request_data = None
             if not config.get('hide_request', False):
-                request_data = self._extract_request_data(request)
+                request_data = self._extract_request_data(request, response, self._get_body_capture(config))
             
             log_data = {
                 'request_id': getattr(request, 'log_id', ''),
@@ -84,7 +96,8 @@ class LoggingMiddleware(MiddlewareMixin):
                 'request_data': request_data,
                 'tag': config.get('tag'),
                 'category': config.get('category'),
-                'action_type': 'request'
+                'action_type': 'request',
+                'sample_rate': getattr(request, 'log_sample_rate', None)
             }
             
             api_logger.info(
@@ -95,11 +108,11 @@ class LoggingMiddleware(MiddlewareMixin):
         except Exception as e:
             logging.error(f"Request logging error: {e}")
     
-    def _log_response(self, request, response, config):
+    def _log_response(self, request, response, config, duration_ms=None):
         try:
             response_data = None
             if not config.get('hide_response', False):
-                response_data = self._extract_response_data(response)
+                response_data = self._extract_response_data(response, self._get_body_capture(config))
             
             log_data = {
                 'request_id': getattr(request, 'log_id', ''),
@@ -108,10 +121,12 @@ class LoggingMiddleware(MiddlewareMixin):
                 'request_path': request.path,
                 'response_status': response.status_code,
                 'response_data': response_data,
+                'duration_ms': duration_ms,
                 'tag': config.get('tag'),
                 'category': config.get('category'),
                 'action_type': 'response',
-                'success': response.status_code < 400
+                'success': response.status_code < 400,
+                'sample_rate': getattr(request, 'log_sample_rate', None)
             }
             
             log_level = self._get_log_level(response.status_code)
@@ -124,6 +139,42 @@ class LoggingMiddleware(MiddlewareMixin):
         except Exception as e:
             logging.error(f"Response logging error: {e}")
     
+    def _is_sampled(self, request, response, config):
+        rates = dict(getattr(settings, 'LOG_SAMPLING', {}).get('RATES', {}))
+        rates.update(config.get('sampling', {}))
+        
+        rate = rates.get(status_class(response.status_code), 1.0)
+        request.log_sample_rate = rate
+        
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        
+        log_id = getattr(request, 'log_id', '')
+        return int(log_id.replace('-', '')[:8] or '0', 16) / 0xFFFFFFFF < rate
+    
+    def _log_coalesced(self, request, response, config):
+        try:
+            log_data = {
+                'request_method': request.method,
+                'request_path': request.path,
+                'response_status': response.status_code,
+                'tag': config.get('tag'),
+                'category': config.get('category'),
+                'action_type': 'response',
+                'success': response.status_code < 400,
+                'coalesce': True
+            }
+            
+            getattr(api_logger, self._get_log_level(response.status_code))(
+                f"API Response: {request.method} {request.path} - {response.status_code} - [{config.get('tag')}]",
+                extra=log_data
+            )
+        
+        except Exception as e:
+            logging.error(f"Response logging error: {e}")
+    
     def _log_exception(self, request, exception):
         try:
             config = self._get_path_config(request)
@@ -152,41 +203,84 @@ class LoggingMiddleware(MiddlewareMixin):
         except Exception as e:
             logging.error(f"Exception logging error: {e}")
     
-    def _extract_request_data(self, request):
+    def _get_body_capture(self, config):
+        capture_settings = getattr(settings, 'LOG_BODY_CAPTURE', {})
+        
+        redact_fields = list(capture_settings.get('REDACT_FIELDS', []))
+        redact_fields += config.get('redact_fields', [])
+        
+        field_limits = dict(capture_settings.get('FIELD_LIMITS', {}))
+        field_limits.update(config.get('field_limits', {}))
+        
+        return BodyCapture(
+            max_bytes=config.get('max_body_bytes', capture_settings.get('MAX_BYTES', 10000)),
+            redact_fields=redact_fields,
+            field_limits=field_limits
+        )
+    
+    def _extract_request_data(self, request, response, capture):
         try:
-            if (hasattr(request, 'content_type') and 
-                request.content_type == 'application/json' and 
-                hasattr(request, 'body')):
-                return json.loads(request.body.decode('utf-8'))
+            renderer_context = getattr(response, 'renderer_context', None) or {}
+            drf_request = renderer_context.get('request')
+            parsed_data = getattr(drf_request, '_full_data', Empty)
+            if parsed_data is not Empty:
+                return capture.from_data(parsed_data)
+            
+            if request.method == 'GET':
+                return capture.from_data(request.GET)
+            
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            if content_length > capture.max_bytes:
+                return capture.too_large(content_length)
             
-            elif request.method == 'POST' and hasattr(request, 'POST'):
-                return dict(request.POST)
+            if request.content_type == 'application/json':
+                return capture.from_bytes(request.body)
             
-            elif request.method == 'GET' and hasattr(request, 'GET'):
-                return dict(request.GET)
+            if request.method == 'POST':
+                return capture.from_data(request.POST)
             
-        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        except (RawPostDataException, ValueError, AttributeError):
             pass
         
         return None
     
-    def _extract_response_data(self, response):
+    def _extract_response_data(self, response, capture):
         try:
+            if getattr(response, 'streaming', False):
+                return None
+            
+            if getattr(response, 'data', None) is not None:
+                return capture.from_data(response.data)
+            
             content_type = response.get('Content-Type', '')
-            if (content_type.startswith('application/json') and 
-                hasattr(response, 'content')):
-                
-                content = response.content.decode('utf-8')
-                if len(content) < 10000:
-                    return json.loads(content)
-                else:
-                    return {'_message': 'Response too large to log'}
+            if content_type.startswith('application/json'):
+                return capture.from_bytes(response.content)
 
-        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+        except (ValueError, AttributeError):
             pass
         
         return None
     
+    def _get_duration_ms(self, request):
+        started_at = getattr(request, 'log_started_at', None)
+        if started_at is None:
+            return None
+        return round((time.monotonic() - started_at) * 1000, 3)
+    
+    def _record_rollup(self, request, response, config, duration_ms):
+        if duration_ms is None:
+            return
+        
+        try:
+            resolver_match = getattr(request, 'resolver_match', None)
+            route = resolver_match.route if resolver_match else '<unmatched>'
+            tag = config.get('tag') if config else None
+            
+            get_rollup_aggregator().record(route, tag, response.status_code, duration_ms)
+        
+        except Exception as e:
+            logging.error(f"Rollup recording error: {e}")
+    
     def _get_log_level(self, status_code):
         if status_code >= 500:
             return 'error'
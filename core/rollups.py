@@ -0,0 +1,116 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pymongo.operations import UpdateOne
+from django.conf import settings
+from core.log_queries import get_log_database
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def bucket_label(duration_ms, buckets=LATENCY_BUCKETS_MS):
+    for bound in buckets:
+        if duration_ms <= bound:
+            return f'le_{bound}'
+    return 'le_inf'
+
+
+def status_class(status_code):
+    return f'{status_code // 100}xx'
+
+
+class RollupAggregator:
+    def __init__(self, collection_name='api_rollups', flush_interval=10):
+        self.collection_name = collection_name
+        self.flush_interval = flush_interval
+        self.buckets = {}
+        self.indexes_created = False
+        self._lock = threading.Lock()
+        self._timer_started = False
+
+    def record(self, route, tag, status_code, duration_ms):
+        minute = datetime.now(dt_timezone.utc).replace(second=0, microsecond=0)
+        key = (minute, route, tag, status_class(status_code))
+
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = {
+                    'count': 0,
+                    'latency_sum_ms': 0.0,
+                    'latency_max_ms': 0.0,
+                    'histogram': {},
+                }
+
+            bucket['count'] += 1
+            bucket['latency_sum_ms'] += duration_ms
+            bucket['latency_max_ms'] = max(bucket['latency_max_ms'], duration_ms)
+            label = bucket_label(duration_ms)
+            bucket['histogram'][label] = bucket['histogram'].get(label, 0) + 1
+
+            if not self._timer_started:
+                self._start_flush_timer()
+
+    def _start_flush_timer(self):
+        def flush_timer():
+            while True:
+                time.sleep(self.flush_interval)
+                self.flush()
+
+        self._timer_started = True
+        threading.Thread(target=flush_timer, daemon=True).start()
+        atexit.register(self.flush)
+
+    def flush(self):
+        with self._lock:
+            buckets, self.buckets = self.buckets, {}
+
+        if not buckets:
+            return
+
+        operations = []
+        for (minute, route, tag, status_cls), bucket in buckets.items():
+            increments = {
+                'count': bucket['count'],
+                'latency_sum_ms': bucket['latency_sum_ms'],
+            }
+            for label, count in bucket['histogram'].items():
+                increments[f'histogram.{label}'] = count
+
+            operations.append(UpdateOne(
+                {'minute': minute, 'route': route, 'tag': tag, 'status_class': status_cls},
+                {'$inc': increments, '$max': {'latency_max_ms': bucket['latency_max_ms']}},
+                upsert=True
+            ))
+
+        try:
+            collection = get_log_database()[self.collection_name]
+
+            if not self.indexes_created:
+                collection.create_index(
+                    [("minute", 1), ("route", 1), ("tag", 1), ("status_class", 1)],
+                    unique=True
+                )
+                collection.create_index([("route", 1), ("minute", -1)])
+                collection.create_index([("tag", 1), ("minute", -1)])
+                self.indexes_created = True
+
+            collection.bulk_write(operations, ordered=False)
+
+        except Exception as e:
+            pass
+
+
+_aggregator = None
+
+
+def get_rollup_aggregator():
+    global _aggregator
+    if _aggregator is None:
+        rollup_settings = getattr(settings, 'LOG_ROLLUPS', {})
+        _aggregator = RollupAggregator(
+            collection_name=rollup_settings.get('COLLECTION', 'api_rollups'),
+            flush_interval=rollup_settings.get('FLUSH_INTERVAL', 10),
+        )
+    return _aggregator
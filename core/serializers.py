@@ -0,0 +1,34 @@
+from rest_framework import serializers
+from core.log_queries import LOG_COLLECTIONS
+
+class LogQuerySerializer(serializers.Serializer):
+    collection = serializers.ChoiceField(choices=LOG_COLLECTIONS, default='api_logs')
+    tag = serializers.CharField(required=False)
+    category = serializers.CharField(required=False)
+    request_id = serializers.CharField(required=False)
+    path = serializers.CharField(required=False)
+    status = serializers.IntegerField(required=False, min_value=100, max_value=599)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    include_payload = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        since = attrs.get('since')
+        until = attrs.get('until')
+        if since and until and since >= until:
+            raise serializers.ValidationError("'since' must be earlier than 'until'.")
+        return attrs
+
+
+class LogPageSerializer(LogQuerySerializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(default=50, min_value=1, max_value=500)
+
+
+class RollupQuerySerializer(serializers.Serializer):
+    route = serializers.CharField(required=False)
+    tag = serializers.CharField(required=False)
+    status_class = serializers.ChoiceField(choices=['1xx', '2xx', '3xx', '4xx', '5xx'], required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(default=1440, min_value=1, max_value=10080)
@@ -0,0 +1,69 @@
+import json
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import QueryDict
+from core.capture import BodyCapture, REDACTED, TRUNCATED_SUFFIX
+
+
+def test_empty_bodies():
+    capture = BodyCapture()
+
+    assert capture.from_data(None) is None
+    assert capture.from_bytes(b'') is None
+    assert capture.from_bytes(b'not json') is None
+
+
+def test_redacts_fields_case_insensitively_at_any_depth():
+    capture = BodyCapture(redact_fields=['password', 'Authorization'])
+
+    data = capture.from_data({
+        'Password': 'secret',
+        'user': {'authorization': 'Bearer token', 'name': 'mert'},
+        'items': [{'password': 'secret'}],
+    })
+
+    assert data == {
+        'Password': REDACTED,
+        'user': {'authorization': REDACTED, 'name': 'mert'},
+        'items': [{'password': REDACTED}],
+    }
+
+
+def test_truncates_fields_over_their_limit():
+    capture = BodyCapture(field_limits={'message': 5})
+
+    data = capture.from_data({'message': 'Hello, world', 'subject': 'Hello, world'})
+
+    assert data == {'message': 'Hello' + TRUNCATED_SUFFIX, 'subject': 'Hello, world'}
+
+
+def test_total_budget_bounds_the_whole_body():
+    capture = BodyCapture(max_bytes=10)
+
+    data = capture.from_data({'a': '12345678', 'b': '12345678', 'c': '12345678'})
+
+    assert data == {'a': '12345678', 'b': '12' + TRUNCATED_SUFFIX, 'c': TRUNCATED_SUFFIX}
+
+
+def test_from_bytes_checks_size_before_decoding():
+    capture = BodyCapture(max_bytes=20)
+    raw = json.dumps({'message': 'x' * 100}).encode('utf-8')
+
+    assert capture.from_bytes(raw) == {'_message': 'Body too large to log', '_size': len(raw)}
+    assert capture.from_bytes(b'{"subject": "Hi"}') == {'subject': 'Hi'}
+
+
+def test_query_dicts_keep_repeated_values():
+    capture = BodyCapture()
+
+    data = capture.from_data(QueryDict('tag=a&tag=b&status=201'))
+
+    assert data == {'tag': ['a', 'b'], 'status': '201'}
+
+
+def test_files_are_described_not_read():
+    capture = BodyCapture(max_bytes=100)
+    upload = SimpleUploadedFile('report.pdf', b'x' * 10000, content_type='application/pdf')
+
+    data = capture.from_data({'attachments': [upload]})
+
+    assert data == {'attachments': [{'name': 'report.pdf', 'size': 10000, 'content_type': 'application/pdf'}]}
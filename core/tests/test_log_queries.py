@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+import pytest
+from bson import ObjectId
+from core import log_queries
+from core.logging import AsyncMongoDBHandler
+from core.log_queries import FILTER_FIELDS, InvalidCursor, KEYSET_SORT, build_filter, build_projection, decode_cursor, encode_cursor, find_page
+from core.serializers import LogPageSerializer
+
+NOW = datetime(2024, 12, 25, 14, 30, 0, 123000, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    object_id = ObjectId()
+    cursor = encode_cursor({'timestamp': NOW, '_id': object_id})
+
+    assert decode_cursor(cursor) == (NOW, object_id)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', 'WyJ4Il0=', 'WyIyMDI0LTEyLTI1IiwgIm5vcGUiXQ=='])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_build_filter_without_params():
+    assert build_filter({}) == {}
+
+
+def test_build_filter_maps_params_to_fields():
+    assert build_filter({'tag': 'schedule:mail'}) == {'tag': 'schedule:mail'}
+    assert build_filter({'path': '/api/schedule-mail/', 'status': 201}) == {
+        '$and': [{'request_path': '/api/schedule-mail/'}, {'response_status': 201}]
+    }
+
+
+def test_build_filter_time_range():
+    until = NOW + timedelta(hours=1)
+
+    assert build_filter({'since': NOW, 'until': until}) == {'timestamp': {'$gte': NOW, '$lt': until}}
+
+
+def test_build_filter_cursor_continues_after_the_last_document():
+    object_id = ObjectId()
+    cursor = encode_cursor({'timestamp': NOW, '_id': object_id})
+
+    assert build_filter({'tag': 'schedule:mail'}, cursor) == {
+        '$and': [
+            {'tag': 'schedule:mail'},
+            {'$or': [
+                {'timestamp': {'$lt': NOW}},
+                {'timestamp': NOW, '_id': {'$lt': object_id}},
+            ]},
+        ]
+    }
+
+
+def test_build_projection_hides_payloads_by_default():
+    assert build_projection() == {'request_data': 0, 'response_data': 0, 'exception': 0}
+    assert build_projection(include_payload=True) is None
+
+
+def fake_database(documents):
+    find = mock.Mock()
+    find.return_value.sort.return_value.limit.side_effect = lambda limit: documents[:limit]
+    return {'api_logs': mock.Mock(find=find)}, find
+
+
+def test_find_page_returns_a_cursor_only_when_more_documents_exist():
+    documents = [{'_id': ObjectId(), 'timestamp': NOW - timedelta(seconds=i)} for i in range(3)]
+    keys = [(document['timestamp'], document['_id']) for document in documents]
+    database, find = fake_database(documents)
+
+    with mock.patch.object(log_queries, 'get_log_database', return_value=database):
+        results, next_cursor = find_page('api_logs', {}, limit=2)
+
+    find.return_value.sort.assert_called_once_with(KEYSET_SORT)
+    assert [result['id'] for result in results] == [str(object_id) for _, object_id in keys[:2]]
+    assert decode_cursor(next_cursor) == keys[1]
+
+    documents = [{'_id': ObjectId(), 'timestamp': NOW}]
+    database, find = fake_database(documents)
+
+    with mock.patch.object(log_queries, 'get_log_database', return_value=database):
+        results, next_cursor = find_page('api_logs', {}, limit=2)
+
+    assert len(results) == 1
+    assert next_cursor is None
+
+
+def test_page_serializer_rejects_an_empty_time_range():
+    serializer = LogPageSerializer(data={'since': NOW.isoformat(), 'until': NOW.isoformat()})
+
+    assert not serializer.is_valid()
+    assert 'non_field_errors' in serializer.errors
+
+
+@pytest.mark.parametrize('collection_name', ['api_logs', 'error_logs', 'system_logs'])
+def test_every_filter_has_a_keyset_index(collection_name):
+    with mock.patch('core.logging.MongoClient'), mock.patch.object(AsyncMongoDBHandler, '_start_flush_timer'):
+        handler = AsyncMongoDBHandler('logs')
+    collection = handler.db[collection_name]
+
+    handler._ensure_indexes(collection_name)
+
+    indexes = [call.args[0] for call in collection.create_index.call_args_list]
+    assert [('timestamp', -1), ('_id', -1)] in indexes
+    for field in FILTER_FIELDS.values():
+        assert [(field, 1), ('timestamp', -1), ('_id', -1)] in indexes
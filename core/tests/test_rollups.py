@@ -0,0 +1,201 @@
+from datetime import datetime, timezone
+from unittest import mock
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from pymongo.operations import UpdateOne
+from rest_framework.test import APIRequestFactory, force_authenticate
+from core import log_queries, middleware, rollups
+from core.log_queries import find_rollups
+from core.middleware import LoggingMiddleware
+from core.rollups import RollupAggregator, bucket_label, status_class
+from core.views import LogRollupView
+
+MINUTE = datetime(2024, 12, 25, 14, 30, tzinfo=timezone.utc)
+
+
+def test_bucket_label():
+    assert bucket_label(0.4) == 'le_5'
+    assert bucket_label(5) == 'le_5'
+    assert bucket_label(5.1) == 'le_10'
+    assert bucket_label(10001) == 'le_inf'
+    assert bucket_label(700, buckets=(500, 1000)) == 'le_1000'
+
+
+def test_status_class():
+    assert status_class(201) == '2xx'
+    assert status_class(404) == '4xx'
+    assert status_class(503) == '5xx'
+
+
+@pytest.fixture
+def clock():
+    now = [MINUTE.replace(second=12, microsecond=345)]
+    fake_datetime = mock.Mock(now=lambda tz: now[0])
+    with mock.patch.object(rollups, 'datetime', fake_datetime):
+        yield now
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = RollupAggregator()
+    aggregator._timer_started = True
+    return aggregator
+
+
+@pytest.fixture
+def collection():
+    collection = mock.Mock()
+    with mock.patch.object(rollups, 'get_log_database', return_value={'api_rollups': collection}):
+        yield collection
+
+
+def test_record_buckets_by_minute_route_tag_and_status_class(aggregator, clock):
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 12.5)
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 202, 40)
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 400, 3)
+    aggregator.record('api/logs/', None, 200, 7)
+    clock[0] = MINUTE.replace(minute=31, second=1)
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 2)
+
+    assert aggregator.buckets[(MINUTE, 'api/schedule-mail/', 'schedule:mail', '2xx')] == {
+        'count': 2,
+        'latency_sum_ms': 52.5,
+        'latency_max_ms': 40,
+        'histogram': {'le_25': 1, 'le_50': 1},
+    }
+    assert set(aggregator.buckets) == {
+        (MINUTE, 'api/schedule-mail/', 'schedule:mail', '2xx'),
+        (MINUTE, 'api/schedule-mail/', 'schedule:mail', '4xx'),
+        (MINUTE, 'api/logs/', None, '2xx'),
+        (MINUTE.replace(minute=31), 'api/schedule-mail/', 'schedule:mail', '2xx'),
+    }
+
+
+def test_flush_upserts_increments_and_maximums(aggregator, clock, collection):
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 12.5)
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 40)
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 500, 3000)
+
+    aggregator.flush()
+
+    operations = collection.bulk_write.call_args.args[0]
+    assert collection.bulk_write.call_args.kwargs == {'ordered': False}
+    assert operations == [
+        UpdateOne(
+            {'minute': MINUTE, 'route': 'api/schedule-mail/', 'tag': 'schedule:mail', 'status_class': '2xx'},
+            {
+                '$inc': {'count': 2, 'latency_sum_ms': 52.5, 'histogram.le_25': 1, 'histogram.le_50': 1},
+                '$max': {'latency_max_ms': 40},
+            },
+            upsert=True
+        ),
+        UpdateOne(
+            {'minute': MINUTE, 'route': 'api/schedule-mail/', 'tag': 'schedule:mail', 'status_class': '5xx'},
+            {
+                '$inc': {'count': 1, 'latency_sum_ms': 3000, 'histogram.le_5000': 1},
+                '$max': {'latency_max_ms': 3000},
+            },
+            upsert=True
+        ),
+    ]
+
+
+def test_flush_swaps_the_buffer_before_writing(aggregator, clock, collection):
+    aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 10)
+
+    def record_during_write(operations, ordered):
+        aggregator.record('api/schedule-mail/', 'schedule:mail', 201, 20)
+
+    collection.bulk_write.side_effect = record_during_write
+    aggregator.flush()
+
+    assert [operation._doc['$inc']['count'] for operation in collection.bulk_write.call_args.args[0]] == [1]
+    assert aggregator.buckets[(MINUTE, 'api/schedule-mail/', 'schedule:mail', '2xx')]['latency_sum_ms'] == 20
+
+
+def test_flush_creates_indexes_once_and_skips_empty_buffers(aggregator, clock, collection):
+    aggregator.flush()
+    assert not collection.bulk_write.called
+
+    for _ in range(2):
+        aggregator.record('api/logs/', None, 200, 1)
+        aggregator.flush()
+
+    assert collection.bulk_write.call_count == 2
+    assert collection.create_index.call_count == 3
+    assert collection.create_index.call_args_list[0] == mock.call(
+        [('minute', 1), ('route', 1), ('tag', 1), ('status_class', 1)], unique=True
+    )
+
+
+@pytest.fixture
+def recorder():
+    with mock.patch.object(middleware, 'get_rollup_aggregator') as get_aggregator, \
+            mock.patch.object(middleware, 'api_logger'), \
+            mock.patch.object(middleware.time, 'monotonic', side_effect=[100.0, 100.0123]):
+        yield get_aggregator.return_value
+
+
+def test_middleware_records_duration_for_unmatched_routes(recorder):
+    request = RequestFactory().get('/nowhere/')
+    response = HttpResponse(status=404)
+    handler = LoggingMiddleware(lambda request: response)
+
+    handler(request)
+
+    recorder.record.assert_called_once_with('<unmatched>', None, 404, 12.3)
+
+
+def test_middleware_records_route_and_tag(recorder):
+    request = RequestFactory().post('/api/schedule-mail/', {}, content_type='application/json')
+    response = HttpResponse(status=201)
+
+    def view(request):
+        request.resolver_match = mock.Mock(route='api/schedule-mail/')
+        return response
+
+    LoggingMiddleware(view)(request)
+
+    recorder.record.assert_called_once_with('api/schedule-mail/', 'schedule:mail', 201, 12.3)
+
+
+def test_find_rollups_filters():
+    collection = mock.MagicMock()
+    with mock.patch.object(log_queries, 'get_log_database', return_value={'api_rollups': collection}):
+        find_rollups({'route': 'api/schedule-mail/', 'status_class': '5xx', 'since': MINUTE, 'tag': None}, limit=60)
+
+    collection.find.assert_called_once_with(
+        {'route': 'api/schedule-mail/', 'status_class': '5xx', 'minute': {'$gte': MINUTE}},
+        {'_id': 0}
+    )
+    collection.find.return_value.sort.assert_called_once_with([('minute', -1), ('route', 1)])
+    collection.find.return_value.sort.return_value.limit.assert_called_once_with(60)
+
+
+def get_rollups(user, **params):
+    request = APIRequestFactory().get('/api/logs/rollups/', params)
+    force_authenticate(request, user=user)
+    return LogRollupView.as_view()(request)
+
+
+def test_rollup_view_is_admin_only():
+    with mock.patch('core.views.find_rollups') as find:
+        response = get_rollups(User(username='user', is_staff=False))
+
+    assert response.status_code == 403
+    assert not find.called
+
+
+def test_rollup_view_validates_and_queries():
+    admin = User(username='admin', is_staff=True)
+    with mock.patch('core.views.find_rollups', return_value=[{'count': 3}]) as find:
+        response = get_rollups(admin, status_class='5xx', limit='60')
+        invalid = get_rollups(admin, status_class='6xx')
+
+    assert response.status_code == 200
+    assert response.data == {'results': [{'count': 3}]}
+    assert find.call_args.args[0]['status_class'] == '5xx'
+    assert find.call_args.kwargs == {'limit': 60}
+    assert invalid.status_code == 400
@@ -0,0 +1,147 @@
+import logging
+import uuid
+from datetime import timedelta
+from unittest import mock
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from core import logging as mongo_logging, middleware
+from core.logging import AsyncMongoDBHandler
+from core.middleware import LoggingMiddleware
+
+PATH = '/api/schedule-mail/'
+
+
+@pytest.fixture
+def api_logger():
+    with mock.patch.object(middleware, 'api_logger') as logger, \
+            mock.patch.object(middleware, 'get_rollup_aggregator'):
+        yield logger
+
+
+def make_request(log_id=None):
+    request = RequestFactory().post(PATH, {'recipient_email': 'user@example.com'}, content_type='application/json')
+    LoggingMiddleware(lambda request: None).process_request(request)
+    if log_id:
+        request.log_id = log_id
+    return request
+
+
+def respond(request, status):
+    return LoggingMiddleware(lambda request: None).process_response(request, HttpResponse(status=status))
+
+
+def sampled(status, log_id, rates):
+    with override_settings(LOG_SAMPLING={'RATES': rates}):
+        request = make_request(log_id)
+        return LoggingMiddleware(lambda request: None)._is_sampled(request, HttpResponse(status=status), {})
+
+
+def test_sampling_is_deterministic_per_request_id():
+    log_ids = [str(uuid.uuid4()) for _ in range(200)]
+    rates = {'2xx': 0.5}
+
+    first = [sampled(201, log_id, rates) for log_id in log_ids]
+    second = [sampled(201, log_id, rates) for log_id in log_ids]
+
+    assert first == second
+
+
+def test_sampling_keeps_about_the_configured_share():
+    rates = {'2xx': 0.1}
+    kept = sum(sampled(201, str(uuid.uuid4()), rates) for _ in range(5000))
+
+    assert 350 < kept < 650
+
+
+def test_sampling_rates_per_status_class():
+    rates = {'2xx': 0.0, '4xx': 1.0}
+    log_id = str(uuid.uuid4())
+
+    assert sampled(201, log_id, rates) is False
+    assert sampled(400, log_id, rates) is True
+    assert sampled(500, log_id, rates) is True
+
+
+def test_route_config_overrides_global_rates():
+    with override_settings(LOG_SAMPLING={'RATES': {'2xx': 0.0}}):
+        request = make_request()
+        assert LoggingMiddleware(lambda request: None)._is_sampled(
+            request, HttpResponse(status=201), {'sampling': {'2xx': 1.0}}
+        )
+        assert request.log_sample_rate == 1.0
+
+
+def test_unsampled_responses_are_coalesced(api_logger):
+    with override_settings(LOG_SAMPLING={'RATES': {'2xx': 0.0}}):
+        respond(make_request(), 201)
+
+    api_logger.info.assert_called_once()
+    extra = api_logger.info.call_args.kwargs['extra']
+    assert extra['coalesce'] is True
+    assert extra['response_status'] == 201
+    assert 'request_id' not in extra
+
+
+def test_errors_are_always_logged_in_full(api_logger):
+    with override_settings(LOG_SAMPLING={'RATES': {'2xx': 0.0, '5xx': 1.0}}):
+        respond(make_request(), 503)
+
+    request_log = api_logger.info.call_args.kwargs['extra']
+    response_log = api_logger.error.call_args.kwargs['extra']
+    assert request_log['action_type'] == 'request'
+    assert request_log['request_data'] == {'recipient_email': 'user@example.com'}
+    assert response_log['response_status'] == 503
+    assert response_log['sample_rate'] == 1.0
+    assert 'coalesce' not in response_log
+
+
+@pytest.fixture
+def handler():
+    with mock.patch.object(mongo_logging, 'MongoClient'), \
+            mock.patch.object(AsyncMongoDBHandler, '_start_flush_timer'):
+        yield AsyncMongoDBHandler('logs', batch_size=1000, coalesce_window=60)
+
+
+def emit(handler, status=201, **extra):
+    record = logging.LogRecord('api_logs', logging.INFO, __file__, 1, f'API Response: POST {PATH} - {status}', None, None)
+    for key, value in {'request_path': PATH, 'response_status': status, 'tag': 'schedule:mail', **extra}.items():
+        setattr(record, key, value)
+    handler.emit(record)
+
+
+def test_handler_coalesces_matching_records(handler):
+    for _ in range(100):
+        emit(handler, coalesce=True)
+    for _ in range(3):
+        emit(handler, status=304, coalesce=True)
+    emit(handler, request_id='sampled')
+
+    assert len(handler.log_queue) == 1
+    assert sorted(entry['count'] for entry in handler.coalesced.values()) == [3, 100]
+
+
+def test_handler_releases_coalesced_records_after_the_window(handler):
+    emit(handler, coalesce=True)
+    emit(handler, coalesce=True)
+    entry = next(iter(handler.coalesced.values()))
+
+    handler._release_coalesced()
+    assert handler.log_queue == []
+
+    entry['first_seen'] -= timedelta(seconds=61)
+    handler._release_coalesced()
+    assert handler.coalesced == {}
+    assert len(handler.log_queue) == 1
+    assert handler.log_queue[0]['count'] == 2
+    assert handler.log_queue[0]['coalesced'] is True
+    assert handler.log_queue[0]['last_seen'] >= handler.log_queue[0]['first_seen']
+
+
+def test_handler_close_flushes_pending_coalesced_records(handler):
+    emit(handler, coalesce=True)
+    collection = handler.db.__getitem__.return_value
+
+    handler.close()
+
+    assert collection.insert_one.call_args.args[0]['count'] == 1
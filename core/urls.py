@@ -0,0 +1,8 @@
+from django.urls import path
+from core.views import LogListView, LogExportView, LogRollupView
+
+urlpatterns = [
+    path('logs/', LogListView.as_view(), name='log-list'),
+    path('logs/export/', LogExportView.as_view(), name='log-export'),
+    path('logs/rollups/', LogRollupView.as_view(), name='log-rollups'),
+]
@@ -0,0 +1,70 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from django.http import StreamingHttpResponse
+from core.serializers import LogQuerySerializer, LogPageSerializer, RollupQuerySerializer
+from core.log_queries import find_page, find_rollups, iter_export, InvalidCursor
+
+class LogListView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        serializer = LogPageSerializer(data=request.query_params)
+
+        if serializer.is_valid():
+            data = serializer.validated_data
+
+            try:
+                results, next_cursor = find_page(
+                    data['collection'],
+                    data,
+                    cursor=data.get('cursor'),
+                    limit=data['limit'],
+                    include_payload=data['include_payload']
+                )
+            except InvalidCursor:
+                return Response({'cursor': ['Invalid cursor.']}, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response({
+                'results': results,
+                'next_cursor': next_cursor,
+            }, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LogExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        serializer = LogQuerySerializer(data=request.query_params)
+
+        if serializer.is_valid():
+            data = serializer.validated_data
+
+            response = StreamingHttpResponse(
+                iter_export(data['collection'], data, include_payload=data['include_payload']),
+                content_type='application/x-ndjson'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{data["collection"]}.ndjson"'
+            return response
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class LogRollupView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        serializer = RollupQuerySerializer(data=request.query_params)
+
+        if serializer.is_valid():
+            data = serializer.validated_data
+
+            return Response({
+                'results': find_rollups(data, limit=data['limit']),
+            }, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)